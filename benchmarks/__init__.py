@@ -0,0 +1,25 @@
+"""Benchmarks of the Gira IOT API integration.
+
+The benchmarks drive the integration modules directly, without a running
+Home Assistant instance. Home Assistant itself still has to be installed,
+as the modules import its constants and storage helpers.
+"""
+
+import importlib
+from pathlib import Path
+import sys
+import types
+
+INTEGRATION_DIR: Path = (
+    Path(__file__).resolve().parents[1] / "custom_components" / "hass_gira_iot_api"
+)
+PACKAGE = "hass_gira_iot_api"
+
+
+def load_integration_module(name: str) -> types.ModuleType:
+    """Import a module of the integration without running its entry setup."""
+    if PACKAGE not in sys.modules:
+        package = types.ModuleType(PACKAGE)
+        package.__path__ = [str(INTEGRATION_DIR)]
+        sys.modules[PACKAGE] = package
+    return importlib.import_module(f"{PACKAGE}.{name}")
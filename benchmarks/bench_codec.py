@@ -0,0 +1,79 @@
+"""Benchmark of the JSON codec on realistic callback batches.
+
+Compares the standard library with the installed fast backend on decoding
+value callbacks of several batch sizes and on encoding value writes.
+
+    python -m benchmarks.bench_codec --batches 1 10 100 1000
+"""
+
+import argparse
+from collections.abc import Callable
+import random
+import timeit
+from typing import Any
+
+from . import load_integration_module
+
+
+def callback_batch(events: int, seed: int = 0) -> dict[str, Any]:
+    """Build a value callback as the device posts it."""
+    rng = random.Random(seed)
+    return {
+        "token": "x" * 32,
+        "events": [
+            {
+                "uid": f"a{rng.randrange(36**3):03x}",
+                "value": rng.choice(("0", "1", str(rng.randint(0, 100)), "21.5")),
+            }
+            for _ in range(events)
+        ],
+    }
+
+
+def write_batch(values: int) -> dict[str, Any]:
+    """Build a value write as the write batcher sends it."""
+    return {
+        "values": [
+            {"uid": f"a{index:03x}", "value": index % 2} for index in range(values)
+        ]
+    }
+
+
+def _per_call(func: Callable[[], Any], seconds: float = 0.2) -> float:
+    """Get the mean time of one call in microseconds."""
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    number = max(1, int(number * seconds / 0.2))
+    return min(timer.repeat(repeat=3, number=number)) / number * 1e6
+
+
+def main() -> None:
+    """Run the benchmark for all requested batch sizes."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--batches", type=int, nargs="+", default=[1, 10, 100, 1000])
+    args = parser.parse_args()
+
+    codec = load_integration_module("json_codec")
+    codecs: dict[str, tuple[Callable[[Any], bytes], Callable[[Any], Any]]] = {
+        "json": (codec.stdlib_dumps, codec.stdlib_loads)
+    }
+    if codec.BACKEND != "json":
+        codecs[codec.BACKEND] = (codec.dumps, codec.loads)
+
+    print(  # noqa: T201
+        f"{'events':>7} {'codec':<8} {'bytes':>8} {'loads us':>10} {'dumps us':>10}"
+    )
+    for events in args.batches:
+        body: bytes = codec.stdlib_dumps(callback_batch(events))
+        write = write_batch(events)
+        for name, (dumps, loads) in codecs.items():
+            assert loads(body) == codec.stdlib_loads(body)
+            print(  # noqa: T201
+                f"{events:>7} {name:<8} {len(body):>8} "
+                f"{_per_call(lambda: loads(body)):>10.2f} "
+                f"{_per_call(lambda: dumps(write)):>10.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
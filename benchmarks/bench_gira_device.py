@@ -0,0 +1,113 @@
+"""End-to-end benchmark of GiraDevice against the simulated REST API.
+
+For every project size the benchmark runs `GiraDevice.init`, a second
+`get_all_values` and a burst of concurrent `set_val` calls, and reports the
+wall time, the number of requests the simulator handled and the memory the
+integration keeps after each phase.
+
+    python -m benchmarks.bench_gira_device --sizes 100 1000 5000 --latency 0.01
+"""
+
+import argparse
+import asyncio
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+import time
+import tracemalloc
+
+from . import INTEGRATION_DIR, load_integration_module
+from .gira_simulator import GiraSimulator, SimulatedProject
+
+
+@dataclass
+class PhaseResult:
+    """Result of one benchmark phase."""
+
+    functions: int
+    phase: str
+    seconds: float = 0.0
+    requests: int = 0
+    retained_bytes: int = 0
+
+
+async def run_size(
+    functions: int, latency: float, writes: int, trace_memory: bool
+) -> list[PhaseResult]:
+    """Run all phases against a project with the given number of functions."""
+    gira_device = load_integration_module("gira_device")
+
+    simulator = GiraSimulator(SimulatedProject.generate(functions), latency=latency)
+    await simulator.start()
+    device = gira_device.GiraDevice(
+        host=simulator.host, user="user", password="password"
+    )
+    datapoints: list[str] = list(simulator.project.values)[:writes]
+
+    phases: list[tuple[str, Callable[[], Awaitable[object]]]] = [
+        ("init", device.init),
+        ("get_all_values", device.get_all_values),
+        (
+            f"set_val x{len(datapoints)}",
+            lambda: asyncio.gather(*(device.set_val(uid, 1) for uid in datapoints)),
+        ),
+    ]
+    results: list[PhaseResult] = []
+    try:
+        for name, phase in phases:
+            result = PhaseResult(functions=functions, phase=name)
+            requests = simulator.total_requests
+            start = time.perf_counter()
+            await phase()
+            result.seconds = time.perf_counter() - start
+            result.requests = simulator.total_requests - requests
+            if trace_memory:
+                result.retained_bytes = _retained_bytes()
+            results.append(result)
+    finally:
+        await device.close()
+        await simulator.stop()
+    return results
+
+
+def _retained_bytes() -> int:
+    """Sum the traced memory allocated from within the integration."""
+    snapshot = tracemalloc.take_snapshot().filter_traces(
+        [tracemalloc.Filter(True, str(INTEGRATION_DIR / "*"), all_frames=True)]
+    )
+    return sum(stat.size for stat in snapshot.statistics("filename"))
+
+
+async def _main() -> None:
+    """Run the benchmark for all requested project sizes."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument(
+        "--latency", type=float, default=0.01, help="seconds per request"
+    )
+    parser.add_argument("--writes", type=int, default=120)
+    args = parser.parse_args()
+
+    rows: list[tuple[PhaseResult, PhaseResult]] = []
+    for size in args.sizes:
+        # timings without tracing, memory from a second, traced run
+        timed = await run_size(size, args.latency, args.writes, trace_memory=False)
+        tracemalloc.start(10)
+        try:
+            traced = await run_size(size, args.latency, args.writes, trace_memory=True)
+        finally:
+            tracemalloc.stop()
+        rows.extend(zip(timed, traced, strict=True))
+
+    print(  # noqa: T201
+        f"{'functions':>9} {'phase':<16} {'seconds':>9} {'requests':>9} "
+        f"{'retained KiB':>13}"
+    )
+    for timed, traced in rows:
+        print(  # noqa: T201
+            f"{timed.functions:>9} {timed.phase:<16} {timed.seconds:>9.3f} "
+            f"{timed.requests:>9} {traced.retained_bytes / 1024:>13.1f}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(_main())
@@ -0,0 +1,377 @@
+"""Offline stand-in for the Gira IoT REST API.
+
+The simulator serves a synthetic project over HTTPS, so `GiraDevice` can be
+driven without an X1 or Homeserver. It covers client registration, the
+uiconfig, reading and writing values and callback registration, counts the
+requests per endpoint and can delay every response to mimic a slow gateway.
+
+Run it standalone with:
+
+    python -m benchmarks.gira_simulator --functions 1000 --latency 0.02
+"""
+
+import argparse
+import asyncio
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import UTC, datetime, timedelta
+import ipaddress
+import json
+from pathlib import Path
+import random
+import ssl
+import tempfile
+from typing import Any
+import uuid
+
+from aiohttp import ClientSession, web
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.x509.oid import NameOID
+
+# channel type, datapoint names and trade index of the simulated functions
+FUNCTION_TYPES: list[tuple[str, tuple[str, ...], int]] = [
+    ("de.gira.schema.channels.Switch", ("OnOff",), 0),
+    ("de.gira.schema.channels.KNX.Dimmer", ("OnOff", "Shift", "Brightness"), 0),
+    (
+        "de.gira.schema.channels.DimmerWhite",
+        ("OnOff", "Shift", "Brightness", "Color-Temperature"),
+        0,
+    ),
+    (
+        "de.gira.schema.channels.BlindWithPos",
+        ("Step-Up-Down", "Up-Down", "Movement", "Position", "Slat-Position"),
+        2,
+    ),
+    (
+        "de.gira.schema.channels.KNX.HeatingCoolingSwitchable",
+        ("Current", "Set-Point", "Mode", "Status", "Presence", "Heating", "Cooling"),
+        3,
+    ),
+]
+# function type the device reports for the functions of a channel type
+FUNCTION_TYPE_OF: dict[str, str] = {
+    "de.gira.schema.channels.Switch": "de.gira.schema.functions.Switch",
+    "de.gira.schema.channels.KNX.Dimmer": "de.gira.schema.functions.KNX.Light",
+    "de.gira.schema.channels.DimmerWhite": "de.gira.schema.functions.TunableLight",
+    "de.gira.schema.channels.BlindWithPos": "de.gira.schema.functions.Covering",
+    "de.gira.schema.channels.KNX.HeatingCoolingSwitchable": (
+        "de.gira.schema.functions.KNX.HeatingCooling"
+    ),
+}
+TRADES: list[str] = ["Lights", "Scenes", "Shutter and blinds", "Heating"]
+
+
+@dataclass
+class SimulatedProject:
+    """Synthetic uiconfig and the current datapoint values."""
+
+    uiconfig: dict[str, Any]
+    values: dict[str, str]
+    datapoints: dict[str, list[str]] = field(default_factory=dict)
+
+    @classmethod
+    def generate(cls, functions: int, seed: int = 0) -> "SimulatedProject":
+        """Generate a project with the given number of functions."""
+        rnd = random.Random(seed)
+        project_functions: list[dict[str, Any]] = []
+        trades: list[dict[str, Any]] = [
+            {"uid": f"tr{index}", "displayName": name, "functions": []}
+            for index, name in enumerate(TRADES)
+        ]
+        values: dict[str, str] = {}
+        function_datapoints: dict[str, list[str]] = {}
+        for index in range(functions):
+            channel_type, datapoint_names, trade = FUNCTION_TYPES[
+                index % len(FUNCTION_TYPES)
+            ]
+            function_uid = f"f{index:05x}"
+            datapoints: list[dict[str, Any]] = []
+            for number, name in enumerate(datapoint_names):
+                datapoint_uid = f"{function_uid}d{number}"
+                datapoints.append(
+                    {
+                        "uid": datapoint_uid,
+                        "name": name,
+                        "canRead": True,
+                        "canWrite": True,
+                        "canEvent": True,
+                    }
+                )
+                values[datapoint_uid] = str(rnd.randint(0, 100))
+            project_functions.append(
+                {
+                    "uid": function_uid,
+                    "displayName": f"Function {index}",
+                    "functionType": FUNCTION_TYPE_OF[channel_type],
+                    "channelType": channel_type,
+                    "dataPoints": datapoints,
+                    # padding the real device sends with expand=parameters
+                    "parameters": [
+                        {"key": f"Parameter{number}", "value": "x" * 24}
+                        for number in range(4)
+                    ],
+                }
+            )
+            trades[trade]["functions"].append(function_uid)
+            function_datapoints[function_uid] = [
+                datapoint["uid"] for datapoint in datapoints
+            ]
+
+        locations: list[dict[str, Any]] = [
+            {
+                "displayName": f"Room {index}",
+                "locationType": "de.gira.schema.locations.Room",
+                "functions": [
+                    function["uid"] for function in project_functions[index::20]
+                ],
+            }
+            for index in range(20)
+        ]
+        uiconfig: dict[str, Any] = {
+            "uid": uuid.UUID(int=rnd.getrandbits(128)).hex[:4],
+            "functionType": [],
+            "channelType": [],
+            "functions": project_functions,
+            "locations": locations,
+            "trades": trades,
+        }
+        return cls(uiconfig=uiconfig, values=values, datapoints=function_datapoints)
+
+
+class GiraSimulator:
+    """aiohttp application simulating a Gira IoT REST API device."""
+
+    def __init__(
+        self,
+        project: SimulatedProject,
+        latency: float = 0.0,
+        username: str = "user",
+        password: str = "password",
+    ) -> None:
+        """Init."""
+        self.project: SimulatedProject = project
+        self.latency: float = latency
+        self.requests: Counter[str] = Counter()
+        self.clients: dict[str, dict[str, str]] = {}
+        self._username: str = username
+        self._password: str = password
+        self._tasks: set[asyncio.Task[None]] = set()
+        self._runner: web.AppRunner | None = None
+        self._session: ClientSession | None = None
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.port: int = 0
+
+        self.app = web.Application(middlewares=[self._middleware])
+        self.app.add_routes(
+            [
+                web.post("/api/clients", self.register_client),
+                web.delete("/api/clients/{token}", self.unregister_client),
+                web.post("/api/clients/{token}/callbacks", self.register_callbacks),
+                web.delete("/api/clients/{token}/callbacks", self.remove_callbacks),
+                web.get("/api/v2/uiconfig/uid", self.get_uiconfig_uid),
+                web.get("/api/v2/uiconfig", self.get_uiconfig),
+                web.get("/api/v2/values/{uid}", self.get_values),
+                web.put("/api/v2/values/{uid}", self.put_value),
+                web.put("/api/v2/values", self.put_values),
+            ]
+        )
+
+    @property
+    def host(self) -> str:
+        """Get the host to pass to GiraDevice."""
+        return f"127.0.0.1:{self.port}"
+
+    @property
+    def total_requests(self) -> int:
+        """Get the number of requests handled so far."""
+        return self.requests.total()
+
+    async def start(self, port: int = 0) -> None:
+        """Start serving on localhost."""
+        self._runner = web.AppRunner(self.app)
+        await self._runner.setup()
+        site = web.TCPSite(
+            self._runner, "127.0.0.1", port, ssl_context=self._ssl_context()
+        )
+        await site.start()
+        self.port = self._runner.addresses[0][1]
+        self._session = ClientSession()
+
+    async def stop(self) -> None:
+        """Stop serving."""
+        for task in list(self._tasks):
+            task.cancel()
+        if self._session is not None:
+            await self._session.close()
+        if self._runner is not None:
+            await self._runner.cleanup()
+        self._tmpdir.cleanup()
+
+    def _ssl_context(self) -> ssl.SSLContext:
+        """Create a self-signed server certificate for localhost."""
+        key = ec.generate_private_key(ec.SECP256R1())
+        name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "localhost")])
+        now = datetime.now(tz=UTC)
+        cert = (
+            x509.CertificateBuilder()
+            .subject_name(name)
+            .issuer_name(name)
+            .public_key(key.public_key())
+            .serial_number(x509.random_serial_number())
+            .not_valid_before(now)
+            .not_valid_after(now + timedelta(days=1))
+            .add_extension(
+                x509.SubjectAlternativeName(
+                    [x509.IPAddress(ipaddress.ip_address("127.0.0.1"))]
+                ),
+                critical=False,
+            )
+            .sign(key, hashes.SHA256())
+        )
+        cert_path = Path(self._tmpdir.name) / "simulator.crt"
+        key_path = Path(self._tmpdir.name) / "simulator.key"
+        cert_path.write_bytes(cert.public_bytes(serialization.Encoding.PEM))
+        key_path.write_bytes(
+            key.private_bytes(
+                encoding=serialization.Encoding.PEM,
+                format=serialization.PrivateFormat.PKCS8,
+                encryption_algorithm=serialization.NoEncryption(),
+            )
+        )
+        context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+        context.load_cert_chain(cert_path, key_path)
+        return context
+
+    @web.middleware
+    async def _middleware(self, request: web.Request, handler) -> web.StreamResponse:
+        """Count the request and delay the response."""
+        route = request.match_info.route.resource
+        self.requests[
+            f"{request.method} {route.canonical if route else request.path}"
+        ] += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return await handler(request)
+
+    def _check_token(self, request: web.Request) -> None:
+        """Reject requests with an unknown token."""
+        token = request.query.get("token") or request.match_info.get("token")
+        if token not in self.clients:
+            raise web.HTTPUnauthorized
+
+    async def register_client(self, request: web.Request) -> web.Response:
+        """Register a client and hand out a token."""
+        auth = request.headers.get("Authorization", "")
+        if not auth.startswith("Basic "):
+            raise web.HTTPUnauthorized
+        token = uuid.uuid4().hex
+        self.clients[token] = {}
+        return web.json_response({"token": token}, status=201)
+
+    async def unregister_client(self, request: web.Request) -> web.Response:
+        """Unregister a client."""
+        self._check_token(request)
+        del self.clients[request.match_info["token"]]
+        return web.Response(status=204)
+
+    async def register_callbacks(self, request: web.Request) -> web.Response:
+        """Register the callback urls of a client."""
+        self._check_token(request)
+        self.clients[request.match_info["token"]] = json.loads(await request.read())
+        return web.Response(status=200)
+
+    async def remove_callbacks(self, request: web.Request) -> web.Response:
+        """Remove the callback urls of a client."""
+        self._check_token(request)
+        self.clients[request.match_info["token"]] = {}
+        return web.Response(status=200)
+
+    async def get_uiconfig_uid(self, request: web.Request) -> web.Response:
+        """Get the identifier of the uiconfig."""
+        self._check_token(request)
+        return web.json_response({"uid": self.project.uiconfig["uid"]})
+
+    async def get_uiconfig(self, request: web.Request) -> web.Response:
+        """Get the expanded uiconfig."""
+        self._check_token(request)
+        return web.json_response(self.project.uiconfig)
+
+    async def get_values(self, request: web.Request) -> web.Response:
+        """Get the values of a function or datapoint."""
+        self._check_token(request)
+        uid = request.match_info["uid"]
+        values = self.project.values
+        uids = [uid] if uid in values else self.project.datapoints.get(uid)
+        if not uids:
+            raise web.HTTPNotFound
+        return web.json_response(
+            {"values": [{"uid": uid, "value": values[uid]} for uid in uids]}
+        )
+
+    async def put_value(self, request: web.Request) -> web.Response:
+        """Set the value of a single datapoint."""
+        self._check_token(request)
+        body = json.loads(await request.read())
+        self._apply({request.match_info["uid"]: body["value"]})
+        return web.Response(status=200)
+
+    async def put_values(self, request: web.Request) -> web.Response:
+        """Set the values of several datapoints."""
+        self._check_token(request)
+        body = json.loads(await request.read())
+        self._apply({value["uid"]: value["value"] for value in body["values"]})
+        return web.Response(status=200)
+
+    def _apply(self, updates: dict[str, Any]) -> None:
+        """Store written values and echo them to the value callbacks."""
+        unknown = [uid for uid in updates if uid not in self.project.values]
+        if unknown:
+            raise web.HTTPUnprocessableEntity(text=",".join(unknown))
+        events: list[dict[str, str]] = []
+        for uid, value in updates.items():
+            self.project.values[uid] = str(value)
+            events.append({"uid": uid, "value": str(value)})
+        for token, callbacks in self.clients.items():
+            if self._session is None:
+                break
+            if url := callbacks.get("valueCallback"):
+                task = asyncio.get_running_loop().create_task(
+                    self._post_events(url, token, events)
+                )
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+
+    async def _post_events(
+        self, url: str, token: str, events: list[dict[str, str]]
+    ) -> None:
+        """Post value events to a registered callback url."""
+        assert self._session is not None
+        async with self._session.post(
+            url, json={"token": token, "events": events}, ssl=False
+        ):
+            pass
+
+
+async def _main() -> None:
+    """Serve a synthetic project until interrupted."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--functions", type=int, default=500)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--port", type=int, default=8443)
+    args = parser.parse_args()
+
+    simulator = GiraSimulator(
+        SimulatedProject.generate(args.functions), latency=args.latency
+    )
+    await simulator.start(args.port)
+    print(f"Simulating {args.functions} functions on https://{simulator.host}")  # noqa: T201
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await simulator.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(_main())
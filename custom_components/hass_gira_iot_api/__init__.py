@@ -1,15 +1,21 @@
 """init."""
 
+import asyncio
 import logging
 
+import aiohttp
+
 from config.custom_components.hass_gira_iot_api.coordinator import MyCoordinator
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 
-from .callback_server import CallBackServer
+from .callback_server import async_get_callback_server, async_release_callback_server
 from .configentry import MyConfigEntry, MyData
 from .const import CONF
-from .gira_device import GiraDevice
+from .gira_device import GiraApiError, GiraDevice
+from .http_session import async_get_session
+from .metrics import Metrics
+from .storage import GiraStorage
 
 logging.basicConfig()
 log: logging.Logger = logging.getLogger(name=__name__)
@@ -18,6 +24,7 @@ PLATFORMS: list[str] = [
     "climate",
     "cover",
     "light",
+    "sensor",
 ]
 
 
@@ -28,25 +35,41 @@ async def async_setup_entry(hass: HomeAssistant, entry: MyConfigEntry) -> bool:
     # Store an instance of the "connecting" class that does the work of speaking
     # with your actual devices.
     # hass.data.setdefault(DOMAIN, {})[entry.entry_id] = hub.Hub(hass, entry.data["host"])
+    storage: GiraStorage = GiraStorage(hass=hass, entry_id=entry.entry_id)
+    await storage.async_load()
+    callback_server = async_get_callback_server(hass, entry)
     giraApi: GiraDevice = GiraDevice(
         host=entry.data[CONF.HOST],
         user=entry.data[CONF.USERNAME],
         password=entry.data[CONF.PASSWORD],
+        storage=storage,
+        metrics=Metrics(enabled=entry.options.get(CONF.METRICS, False)),
+        session=async_get_session(hass),
+        callback_url=callback_server.callback_url(entry),
     )
-    coordinator: MyCoordinator = MyCoordinator(hass=hass, gira_api=giraApi)
-
-    entry.runtime_data = MyData(gira_api=giraApi, hass=hass, coordinator=coordinator)
-
-    mycallbackserver: CallBackServer = CallBackServer(
-        entry=entry,
-        giraApi=giraApi,
-        coordinator=coordinator,
+    coordinator: MyCoordinator = MyCoordinator(
         hass=hass,
+        gira_api=giraApi,
+        adaptive_polling=entry.options.get(CONF.ADAPTIVE_POLLING, False),
     )
 
-    await mycallbackserver.start()
+    entry.runtime_data = MyData(gira_api=giraApi, hass=hass, coordinator=coordinator)
 
-    await giraApi.init()
+    # the listener starts (one per port, shared with the other entries of
+    # that port) while the device is connected and its functions are built
+    results = await asyncio.gather(
+        callback_server.async_add_entry(entry),
+        giraApi.init_structure(),
+        return_exceptions=True,
+    )
+    try:
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+        await giraApi.register_callback()
+    except BaseException:
+        await async_release_callback_server(hass, entry)
+        raise
 
     # see https://community.home-assistant.io/t/config-flow-how-to-update-an-existing-entity/522442/8
     entry.async_on_unload(func=entry.add_update_listener(listener=update_listener))
@@ -60,6 +83,13 @@ async def async_setup_entry(hass: HomeAssistant, entry: MyConfigEntry) -> bool:
         entry=entry, platforms=PLATFORMS
     )
 
+    # the entities exist, their values follow in the background
+    entry.async_create_background_task(
+        hass=hass,
+        target=coordinator.async_load_values(entry.entry_id),
+        name="initial values",
+    )
+
     log.info(msg="Init done")
 
     return True
@@ -77,7 +107,30 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     # This is called when an entry/configured device is to be removed. The class
     # needs to unload itself, and remove callbacks. See the classes for further
     # details
-    entry.runtime_data.rest_api.close()
+    await async_release_callback_server(hass, entry)
+    entry.runtime_data.coordinator.ingest.flush()
+    entry.runtime_data.coordinator.writes.cancel()
+    await entry.runtime_data.gira_api.close()
     return await hass.config_entries.async_unload_platforms(
         entry=entry, platforms=PLATFORMS
     )
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Unregister the client and remove the stored data of an entry."""
+    storage: GiraStorage = GiraStorage(hass=hass, entry_id=entry.entry_id)
+    await storage.async_load()
+    giraApi: GiraDevice = GiraDevice(
+        host=entry.data[CONF.HOST],
+        user=entry.data[CONF.USERNAME],
+        password=entry.data[CONF.PASSWORD],
+        storage=storage,
+        session=async_get_session(hass),
+    )
+    try:
+        await giraApi.disconnect()
+    except (aiohttp.ClientError, GiraApiError, TimeoutError) as err:
+        log.warning("Could not unregister from %s: %s", entry.data[CONF.HOST], err)
+    finally:
+        await giraApi.close()
+    await storage.async_remove()
@@ -1,82 +1,197 @@
 """Callback server."""
 
+import asyncio
+import logging
 import ssl
 
 from aiofiles import ospath
 from aiohttp import web
 
 from config.custom_components.hass_gira_iot_api.configentry import MyConfigEntry
-from config.custom_components.hass_gira_iot_api.coordinator import MyCoordinator
 from config.custom_components.hass_gira_iot_api.ssl_helper import (
+    KEY_TYPE_EC,
+    KEY_TYPE_RSA,
     generate_selfsigned_cert,
 )
 from homeassistant.core import HomeAssistant
 
-from .const import CONF
-from .gira_device import GiraDevice
+from . import json_codec
+from .config_sync import async_handle_service_events
+from .const import CONF, CONST
+
+logging.basicConfig()
+log: logging.Logger = logging.getLogger(name=__name__)
+
+RESPONSE_OK: bytes = json_codec.dumps({"status": "ok"})
+DATA_CALLBACK_SERVERS = f"{CONST.DOMAIN}_callback_servers"
 
 
 class CallBackServer:
-    """CallbackServer Class."""
+    """CallbackServer Class.
+
+    One server listens per port and is shared by all config entries using
+    that port. The callbacks of an entry are posted to /<entry_id>/value and
+    /<entry_id>/service and routed to the entry by that path.
+
+    The certificate of a listener is kept in the config directory. Its TLS
+    context is created once per start and idle connections are kept alive,
+    so the frequent callbacks of a device skip the TLS handshake.
+    """
 
     def __init__(
         self,
-        entry: MyConfigEntry,
-        giraApi: GiraDevice,
-        coordinator: MyCoordinator,
         hass: HomeAssistant,
+        port: int | str,
+        callback_host: str,
+        ecdsa: bool = False,
     ) -> None:
         """Init of CallBackServer."""
-        self._entry = entry
-        self._giraApi = giraApi
-        self._coordinator = coordinator
         self._hass = hass
+        self._port = port
+        self._callback_host = callback_host
+        self._key_type: str = KEY_TYPE_EC if ecdsa else KEY_TYPE_RSA
+        self._entries: dict[str, MyConfigEntry] = {}
+        self._runner: web.AppRunner | None = None
+        self._lock = asyncio.Lock()
+
+    def callback_url(self, entry: MyConfigEntry) -> str:
+        """Get the url the device posts the callbacks of an entry to."""
+        callback_host: str = entry.data[CONF.CALLBACK_HOST]
+        return f"https://{callback_host}:{self._port}/{entry.entry_id}"
+
+    @property
+    def in_use(self) -> bool:
+        """Check if any entry routes its callbacks through the server."""
+        return bool(self._entries)
+
+    async def async_add_entry(self, entry: MyConfigEntry) -> None:
+        """Route the callbacks of an entry, starting the server if needed."""
+        self._entries[entry.entry_id] = entry
+        async with self._lock:
+            if self._runner is None:
+                await self.start()
+
+    async def async_remove_entry(self, entry: MyConfigEntry) -> None:
+        """Stop routing the callbacks of an entry, and the server with the last."""
+        self._entries.pop(entry.entry_id, None)
+        async with self._lock:
+            if self._entries or self._runner is None:
+                return
+            await self._runner.cleanup()
+            self._runner = None
+            log.info("Callback server on port %s stopped", self._port)
 
     async def start(self):
         """Start the callback server."""
         app = web.Application()
-        app.add_routes([web.post("/value", self.value)])
-        server = web.AppRunner(app)
+        app.add_routes(
+            [
+                web.post("/{entry_id}/value", self.value),
+                web.post("/{entry_id}/service", self.service),
+            ]
+        )
+        server = web.AppRunner(app, keepalive_timeout=CONST.CALLBACK_KEEPALIVE_TIMEOUT)
         ssl_context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
 
-        if not await ospath.exists("domain_srv.crt") or not await ospath.exists(
-            "domain_srv.key"
-        ):
+        name = f"callback_{self._port}_{self._key_type}"
+        cert_path = self._hass.config.path(CONST.DOMAIN, f"{name}.crt")
+        key_path = self._hass.config.path(CONST.DOMAIN, f"{name}.key")
+        if not await ospath.exists(cert_path) or not await ospath.exists(key_path):
             await generate_selfsigned_cert(
-                "test.de", [self._entry.data[CONF.CALLBACK_HOST]]
+                "test.de",
+                [self._callback_host],
+                key_type=self._key_type,
+                cert_path=cert_path,
+                key_path=key_path,
             )
         await self._hass.async_add_executor_job(
-            ssl_context.load_cert_chain, "domain_srv.crt", "domain_srv.key"
+            ssl_context.load_cert_chain, cert_path, key_path
         )
-        # ssl_context.load_cert_chain("domain_srv.crt", "domain_srv.key")
 
-        self._entry.async_create_background_task(
-            hass=self._hass, target=server.setup(), name="server.setup"
-        )
-        site = web.TCPSite(
-            server, "0.0.0.0", self._entry.data[CONF.PORT], ssl_context=ssl_context
-        )
-        self._entry.async_create_background_task(
-            hass=self._hass, target=site.start(), name="site.start"
-        )
+        await server.setup()
+        site = web.TCPSite(server, "0.0.0.0", self._port, ssl_context=ssl_context)
+        await site.start()
+        self._runner = server
+        log.info("Callback server listening on port %s", self._port)
+
+    def _entry(self, request: web.Request) -> MyConfigEntry:
+        """Get the entry a callback is addressed to."""
+        entry = self._entries.get(request.match_info["entry_id"])
+        if entry is None:
+            raise web.HTTPNotFound
+        return entry
 
     async def value(self, request):
         """Callback function to handle an incomming POST request."""
-        data = await request.json()
+        data = self._entry(request).runtime_data
+        metrics = data.gira_api.metrics
+        start = metrics.start()
+        try:
+            body = json_codec.loads(await request.read())
+            events = body["events"]
+        except (ValueError, KeyError, TypeError):
+            metrics.error("callback:value")
+            raise
         # print(data)
-        written_to_dev = None
-        for event in data["events"]:
-            uid = event["uid"]
-            value = event["value"]
-            for dev_uid, dev in self._giraApi.all_values.items():
-                if uid in dev:  # if uid in dev.keys():
-                    dev[uid] = value
-                    written_to_dev = dev_uid
-                    # print(f"updated values in {dev_uid}")
-            if written_to_dev is not None:
-                self._coordinator.async_set_updated_data(self._giraApi.all_values)
-            else:
-                ...
-                # print("uid not found")
-
-        return web.json_response({"status": "ok"})
+        metrics.count_events(len(events))
+        data.coordinator.async_callback_received()
+        # applied later, coalesced with the events of the next few callbacks
+        data.coordinator.ingest.put(events)
+        metrics.observe("callback:value", start)
+
+        return web.Response(body=RESPONSE_OK, content_type=json_codec.CONTENT_TYPE)
+
+    async def service(self, request):
+        """Callback function to handle an incomming service event."""
+        entry = self._entry(request)
+        data = json_codec.loads(await request.read())
+        # handled in the background, the device only waits for the ack
+        entry.async_create_background_task(
+            hass=self._hass,
+            target=async_handle_service_events(
+                self._hass, entry, data.get("events", [])
+            ),
+            name="service events",
+        )
+        return web.Response(body=RESPONSE_OK, content_type=json_codec.CONTENT_TYPE)
+
+
+def async_get_callback_server(
+    hass: HomeAssistant, entry: MyConfigEntry
+) -> CallBackServer:
+    """Get the callback server of the port of an entry.
+
+    A new server takes the callback host and certificate settings of the
+    entry; a running one is shared as it is.
+    """
+    servers: dict[int | str, CallBackServer] = hass.data.setdefault(
+        DATA_CALLBACK_SERVERS, {}
+    )
+    port: int | str = entry.data[CONF.PORT]
+    server = servers.get(port)
+    if server is None:
+        server = servers[port] = CallBackServer(
+            hass=hass,
+            port=port,
+            callback_host=entry.data[CONF.CALLBACK_HOST],
+            ecdsa=entry.options.get(CONF.CALLBACK_ECDSA, False),
+        )
+    return server
+
+
+async def async_release_callback_server(
+    hass: HomeAssistant, entry: MyConfigEntry
+) -> None:
+    """Detach an entry from its callback server, dropping it if unused.
+
+    The next entry of the port creates a new server with its own settings.
+    """
+    servers: dict[int | str, CallBackServer] = hass.data.get(DATA_CALLBACK_SERVERS, {})
+    port: int | str = entry.data[CONF.PORT]
+    server = servers.get(port)
+    if server is None:
+        return
+    await server.async_remove_entry(entry)
+    # an entry added meanwhile restarts and keeps this server
+    if not server.in_use and servers.get(port) is server:
+        del servers[port]
@@ -2,9 +2,10 @@
 
 from __future__ import annotations
 
+from collections.abc import Iterable
 import logging
 
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
 from .configentry import MyConfigEntry
@@ -22,19 +23,29 @@ async def async_setup_entry(
 ) -> None:
     """Set up the climate platform."""
 
-    _useless: HomeAssistant = hass
     coordinator = config_entry.runtime_data.coordinator
-    # start with an empty list of entries
-    entries: list[MyClimateEntity] = []
-
+    _useless = hass
     giraAPI: GiraDevice = config_entry.runtime_data.gira_api
-    for climate in giraAPI.gira_climates.values():
-        myclimate: MyClimateEntity = MyClimateEntity(
-            myGiraDevice=giraAPI, myGiraClimate=climate, coordinator=coordinator
+
+    @callback
+    def async_add_climates(uids: Iterable[str]) -> None:
+        """Add the entities of the given functions."""
+        # start with an empty list of entries
+        entries: list[MyClimateEntity] = []
+        for uid in uids:
+            climate = giraAPI.gira_climates.get(uid)
+            if climate is None:
+                continue
+            myclimate: MyClimateEntity = MyClimateEntity(
+                myGiraDevice=giraAPI, myGiraClimate=climate, coordinator=coordinator
+            )
+            config_entry.runtime_data.entities[uid] = myclimate
+            entries.append(myclimate)
+
+        async_add_entities(
+            entries,
+            update_before_add=True,
         )
-        entries.append(myclimate)
 
-    async_add_entities(
-        new_entities=entries,
-        update_before_add=True,
-    )
+    config_entry.runtime_data.entity_adders["climate"] = async_add_climates
+    async_add_climates(giraAPI.gira_climates)
@@ -0,0 +1,104 @@
+"""Latest-wins debouncing of repeated datapoint commands."""
+
+import asyncio
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+import logging
+from typing import Any
+
+logging.basicConfig()
+log: logging.Logger = logging.getLogger(name=__name__)
+
+
+@dataclass
+class _Command:
+    """Latest target of a datapoint and the callers waiting for it."""
+
+    value: Any
+    waiters: list[asyncio.Future[None]] = field(default_factory=list)
+    handle: asyncio.TimerHandle | None = None
+    settled: bool = False
+
+
+class CommandDebouncer:
+    """Send only the latest of the commands issued to a datapoint.
+
+    A command is held for `settle` seconds. Commands to the same datapoint
+    arriving meanwhile replace its value, so dragging a slider sends at most
+    one value per settle time. While a value is being sent, newer commands
+    wait for it and only the latest of them is sent next. Every caller is
+    released once the value superseding its own has been sent.
+    """
+
+    def __init__(
+        self, send: Callable[[str, Any], Awaitable[None]], settle: float
+    ) -> None:
+        """Init."""
+        self._send = send
+        self._settle: float = settle
+        self._pending: dict[str, _Command] = {}
+        self._in_flight: set[str] = set()
+        self._tasks: set[asyncio.Task[None]] = set()
+
+    async def command(self, uid: str, value: Any) -> None:
+        """Queue a command and wait until it or a newer one has been sent."""
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[None] = loop.create_future()
+        command = self._pending.get(uid)
+        if command is None:
+            command = self._pending[uid] = _Command(value=value)
+            command.handle = loop.call_later(self._settle, self._settled, uid)
+        else:
+            command.value = value
+        command.waiters.append(future)
+        await future
+
+    def discard(self, *uids: str) -> None:
+        """Drop the pending commands of datapoints, releasing their callers."""
+        for uid in uids:
+            command = self._pending.pop(uid, None)
+            if command is None:
+                continue
+            if command.handle is not None:
+                command.handle.cancel()
+            for waiter in command.waiters:
+                if not waiter.done():
+                    waiter.set_result(None)
+
+    def _settled(self, uid: str) -> None:
+        """Send the command once the previous one of its datapoint is done."""
+        command = self._pending.get(uid)
+        if command is None:
+            return
+        command.handle = None
+        command.settled = True
+        if uid in self._in_flight:
+            return
+        del self._pending[uid]
+        self._in_flight.add(uid)
+        task = asyncio.get_running_loop().create_task(self._send_command(uid, command))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _send_command(self, uid: str, command: _Command) -> None:
+        """Send a command and complete the futures of its callers."""
+        try:
+            await self._send(uid, command.value)
+        except Exception as err:  # noqa: BLE001
+            log.warning("Failed to send %s to %s: %s", command.value, uid, err)
+            for waiter in command.waiters:
+                if not waiter.done():
+                    waiter.set_exception(err)
+        else:
+            for waiter in command.waiters:
+                if not waiter.done():
+                    waiter.set_result(None)
+        finally:
+            for waiter in command.waiters:
+                if not waiter.done():
+                    waiter.cancel()
+            self._in_flight.discard(uid)
+            # a newer command that settled meanwhile goes out right away
+            newer = self._pending.get(uid)
+            if newer is not None and newer.settled:
+                self._settled(uid)
@@ -5,6 +5,7 @@ from typing import Any
 import voluptuous as vol
 
 from homeassistant import config_entries, exceptions
+from homeassistant.core import callback
 
 from .const import CONF, CONST
 
@@ -47,6 +48,14 @@ class ConfigFlow(config_entries.ConfigFlow, domain=CONST.DOMAIN):
     # changes.
     CONNECTION_CLASS = config_entries.CONN_CLASS_LOCAL_PUSH
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(
+        config_entry: config_entries.ConfigEntry,
+    ) -> config_entries.OptionsFlow:
+        """Get the options flow."""
+        return OptionsFlowHandler()
+
     async def async_step_user(
         self, user_input: dict[str, str] | None = None
     ) -> config_entries.ConfigFlowResult:
@@ -148,6 +157,35 @@ class ConfigFlow(config_entries.ConfigFlow, domain=CONST.DOMAIN):
         )
 
 
+class OptionsFlowHandler(config_entries.OptionsFlow):
+    """Options flow."""
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> config_entries.ConfigFlowResult:
+        """Manage the options."""
+        if user_input is not None:
+            return self.async_create_entry(data=user_input)
+
+        options_schema: vol.Schema = vol.Schema(
+            schema={
+                vol.Optional(
+                    schema=CONF.METRICS,
+                    default=self.config_entry.options.get(CONF.METRICS, False),
+                ): bool,
+                vol.Optional(
+                    schema=CONF.ADAPTIVE_POLLING,
+                    default=self.config_entry.options.get(CONF.ADAPTIVE_POLLING, False),
+                ): bool,
+                vol.Optional(
+                    schema=CONF.CALLBACK_ECDSA,
+                    default=self.config_entry.options.get(CONF.CALLBACK_ECDSA, False),
+                ): bool,
+            }
+        )
+        return self.async_show_form(step_id="init", data_schema=options_schema)
+
+
 class InvalidHost(exceptions.HomeAssistantError):
     """Error to indicate there is an invalid hostname."""
 
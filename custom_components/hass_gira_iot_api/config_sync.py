@@ -0,0 +1,86 @@
+"""Incremental updates on Gira service callbacks."""
+
+from collections.abc import Iterable
+import logging
+from typing import Any
+
+import aiohttp
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
+
+from .configentry import MyConfigEntry
+from .gira_device import GiraApiError
+from .request_scheduler import Priority
+
+logging.basicConfig()
+log: logging.Logger = logging.getLogger(name=__name__)
+
+CONFIG_EVENTS: set[str] = {"uiConfigChanged", "projectConfigChanged"}
+RESTART_EVENTS: set[str] = {"restart", "startup"}
+
+
+async def async_handle_service_events(
+    hass: HomeAssistant, entry: MyConfigEntry, events: Iterable[dict[str, Any]]
+) -> None:
+    """Handle the events of a service callback.
+
+    Events arriving while an earlier batch is handled wait for it, so
+    overlapping config changes are applied one after another.
+    """
+    names: set[str] = {event.get("event", "") for event in events}
+    async with entry.runtime_data.sync_lock:
+        try:
+            if names & RESTART_EVENTS:
+                await async_resync(entry)
+            if names & CONFIG_EVENTS:
+                await async_apply_ui_changes(hass, entry)
+        except (aiohttp.ClientError, GiraApiError, TimeoutError) as err:
+            log.warning("Failed to handle service events %s: %s", names, err)
+
+
+async def async_resync(entry: MyConfigEntry) -> None:
+    """Reconnect after a device restart and fetch all values again."""
+    data = entry.runtime_data
+    await data.gira_api.connect()
+    await data.gira_api.register_callback()
+    changed, _failed = await data.gira_api.get_values(
+        data.gira_api.function_uids(), priority=Priority.BACKGROUND
+    )
+    data.coordinator.async_update_functions(changed)
+
+
+async def async_apply_ui_changes(hass: HomeAssistant, entry: MyConfigEntry) -> None:
+    """Fetch the changed uiconfig and update only the affected entities.
+
+    Entities of removed functions are removed from the entity registry,
+    those of changed functions are re-created under their registry entry
+    and new functions get new entities. Everything else is kept.
+    """
+    data = entry.runtime_data
+    added, removed, changed = await data.gira_api.refresh_ui()
+    if not (added or removed or changed):
+        return
+    log.info(
+        "uiconfig changed: %d functions added, %d removed, %d changed",
+        len(added),
+        len(removed),
+        len(changed),
+    )
+
+    registry: er.EntityRegistry = er.async_get(hass)
+    for uid in removed:
+        entity = data.entities.pop(uid, None)
+        if entity is None:
+            continue
+        if entity.registry_entry is not None:
+            registry.async_remove(entity.entity_id)
+        else:
+            await entity.async_remove()
+    for uid in changed:
+        entity = data.entities.pop(uid, None)
+        if entity is not None:
+            await entity.async_remove(force_remove=True)
+
+    for async_add in data.entity_adders.values():
+        async_add(added | changed)
@@ -1,10 +1,13 @@
 """my config entry."""
 
-from dataclasses import dataclass
+import asyncio
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field
 
 from config.custom_components.hass_gira_iot_api.coordinator import MyCoordinator
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
+from homeassistant.helpers.entity import Entity
 
 from .gira_device import GiraDevice
 
@@ -16,6 +19,13 @@ class MyData:
     gira_api: GiraDevice
     hass: HomeAssistant
     coordinator: MyCoordinator
+    # entities by function uid and, per platform, a callback adding the
+    # entities of the given function uids
+    entities: dict[str, Entity] = field(default_factory=dict)
+    entity_adders: dict[str, Callable[[Iterable[str]], None]] = field(
+        default_factory=dict
+    )
+    sync_lock: asyncio.Lock = field(default_factory=asyncio.Lock)
 
 
 type MyConfigEntry = ConfigEntry[MyData]
@@ -14,6 +14,9 @@ class ConfConstants:
     USERNAME = CONF_USERNAME
     CALLBACK_HOST: str = "ha_ip"
     PORT = CONF_PORT
+    METRICS: str = "metrics"
+    ADAPTIVE_POLLING: str = "adaptive_polling"
+    CALLBACK_ECDSA: str = "callback_ecdsa"
 
 
 CONF = ConfConstants()
@@ -27,6 +30,33 @@ class MainConstants:
     SCAN_INTERVAL = "60"  # timedelta(seconds=60))
     UNIQUE_ID = "unique_id"
     APPID = 100
+    FETCH_CONCURRENCY = 8  # max parallel value requests to the device
+    FETCH_TIMEOUT = 10  # seconds per value request
+    WRITE_WINDOW = 0.02  # seconds to collect writes into one request
+    WRITE_MAX_BATCH = 100  # max values per write request
+    WRITE_CONFIRM_TIMEOUT = 5  # seconds until an unconfirmed write is rolled back
+    WRITE_CONFIRM_TOLERANCE = 1  # max difference of a confirming fractional value
+    LIGHT_COMMAND_SETTLE = 0.1  # seconds to wait for newer brightness commands
+    COVER_COMMAND_SETTLE = 0.3  # seconds to wait for newer position commands
+    HTTP_LIMIT_PER_HOST = 8  # max open connections to one device
+    HTTP_KEEPALIVE_TIMEOUT = 10  # seconds to keep an idle connection open
+    HTTP_DNS_CACHE_TTL = 300  # seconds to cache resolved device hostnames
+    HTTP_CHUNK_SIZE = 65536  # bytes read at once from large responses
+    REQUEST_CONCURRENCY = 6  # max requests in flight to one device
+    REQUEST_RESERVED = 1  # of those, slots kept free for user commands
+    RETRY_ATTEMPTS = 3  # tries of a read before giving up
+    RETRY_BACKOFF = 0.5  # seconds, doubled per retry and jittered
+    RETRY_MAX_BACKOFF = 5  # upper limit of the retry backoff
+    BREAKER_THRESHOLD = 5  # consecutive failures opening the circuit breaker
+    BREAKER_RESET_TIMEOUT = 30  # seconds until an open breaker probes the device
+    PUSH_CHECK_INTERVAL = 60  # seconds between callback liveness checks
+    PUSH_TIMEOUT = 300  # seconds without callbacks before polling starts
+    POLL_INTERVAL = 30  # seconds between polls while callbacks are quiet
+    POLL_MAX_INTERVAL = 600  # upper limit of the polling backoff
+    POLL_BATCH = 20  # functions fetched per poll
+    CALLBACK_KEEPALIVE_TIMEOUT = 120  # seconds to keep an idle callback connection
+    INGEST_WINDOW = 0.1  # seconds to coalesce callback events
+    INGEST_MAX_SIZE = 2000  # pending datapoints before applying early
 
 
 CONST = MainConstants()
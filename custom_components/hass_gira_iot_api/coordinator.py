@@ -1,38 +1,288 @@
 """The Update Coordinator for the ModbusItems."""
 
+from collections.abc import Iterable
 from datetime import timedelta
 import logging
+import time
 from typing import Any
 
-from config.custom_components.hass_gira_iot_api.gira_device import GiraDevice
-from homeassistant.core import HomeAssistant
-from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+import aiohttp
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.update_coordinator import (
+    DataUpdateCoordinator,
+    UpdateFailed,
+)
+
+from .const import CONST
+from .gira_device import GiraApiError, GiraDevice
+from .ingest_queue import IngestQueue
+from .pending_writes import PendingWrites
+from .request_scheduler import Priority
+from .value_store import ValueStore
 
 _LOGGER = logging.getLogger(__name__)
 
 
-class MyCoordinator(DataUpdateCoordinator[dict[str, Any]]):
-    """Coordinator for Gira IOT API."""
+class MyCoordinator(DataUpdateCoordinator[ValueStore]):
+    """Coordinator for Gira IOT API.
+
+    The values are pushed by the device callbacks. A refresh fetches the
+    functions whose values failed to load again, backing off while they
+    keep failing. With adaptive polling, a refresh checks when the last
+    callback arrived. While callbacks are
+    quiet it polls a slice of the functions per refresh and re-registers
+    the callback, backing off as long as the polls find nothing new.
+    """
 
     def __init__(
         self,
         hass: HomeAssistant,
         gira_api: GiraDevice,
+        adaptive_polling: bool = False,
     ) -> None:
         """Initialize Gira IOT API coordinator."""
         super().__init__(
             hass=hass,
             logger=_LOGGER,
             name="gira_iot_api",
-            update_interval=timedelta(seconds=60),
-            always_update=True,
+            update_interval=timedelta(seconds=CONST.PUSH_CHECK_INTERVAL),
+            always_update=False,
         )
         self.gira_api = gira_api
+        self.data = gira_api.all_values
+        self._function_listeners: dict[str, list[CALLBACK_TYPE]] = {}
+        self.adaptive_polling: bool = adaptive_polling
+        self.last_callback: float = time.monotonic()
+        self.polling: bool = False
+        self._poll_interval: float = CONST.POLL_INTERVAL
+        self._poll_cursor: int = 0
+        self._register_backoff: float = CONST.POLL_INTERVAL
+        self._next_register: float = 0.0
+        self._reload_backoff: float = CONST.POLL_INTERVAL
+        self._next_reload: float = 0.0
+        self.ingest: IngestQueue = IngestQueue(
+            apply=self._async_apply_values,
+            accepts=lambda uid: gira_api.function_of(uid) is not None,
+        )
+        self.writes: PendingWrites = PendingWrites(
+            store=gira_api.all_values,
+            notify=self.async_update_functions,
+            metrics=gira_api.metrics,
+        )
 
     async def _async_setup(self) -> None:
         """Set up the coordinator."""
         await self.gira_api.get_all_values()
 
-    async def _async_update_data(self) -> dict[str, dict[str, Any]]:
-        """Fetch data from WebIF endpoint."""
+    async def async_load_values(self, entry_id: str) -> None:
+        """Fetch the values of all functions and render them.
+
+        Runs in the background once the entities are added. The functions
+        of visible entities are fetched and rendered first, those of hidden
+        entities next. Disabled entities are skipped, enabling one reloads
+        the entry anyway. Functions that fail are fetched again by the
+        refreshes.
+        """
+        failed: dict[str, BaseException] = {}
+        for priority, uids in self._hydration_order(entry_id):
+            try:
+                _changed, tier_failed = await self.gira_api.get_values(
+                    uids, priority=priority
+                )
+            except (aiohttp.ClientError, GiraApiError, TimeoutError) as err:
+                tier_failed = dict.fromkeys(uids, err)
+            failed.update(tier_failed)
+            self.async_update_functions(uids)
+        self.gira_api.failed_values = failed
+        if failed:
+            _LOGGER.warning(
+                "Failed to get values of %d functions: %s",
+                len(failed),
+                ", ".join(failed),
+            )
+
+    def _hydration_order(self, entry_id: str) -> list[tuple[Priority, list[str]]]:
+        """Split the functions into visible and hidden ones by their entities.
+
+        Visible ones are fetched like a refresh, hidden ones in the background.
+        """
+        registry = er.async_get(self.hass)
+        registry_entries: dict[str, er.RegistryEntry] = {
+            registry_entry.unique_id: registry_entry
+            for registry_entry in er.async_entries_for_config_entry(registry, entry_id)
+        }
+        visible: list[str] = []
+        hidden: list[str] = []
+        for uid in self.gira_api.function_uids():
+            registry_entry = registry_entries.get(f"{CONST.DOMAIN}_{uid}")
+            if registry_entry is None:
+                # new entities are enabled and visible
+                visible.append(uid)
+            elif registry_entry.disabled:
+                continue
+            elif registry_entry.hidden:
+                hidden.append(uid)
+            else:
+                visible.append(uid)
+        return [
+            (priority, uids)
+            for priority, uids in (
+                (Priority.REFRESH, visible),
+                (Priority.BACKGROUND, hidden),
+            )
+            if uids
+        ]
+
+    @property
+    def push_healthy(self) -> bool:
+        """Check if the device delivered a callback recently."""
+        return time.monotonic() - self.last_callback < CONST.PUSH_TIMEOUT
+
+    @callback
+    def async_callback_received(self) -> None:
+        """Note that the device delivered a callback."""
+        self.last_callback = time.monotonic()
+        if self.polling:
+            _LOGGER.info("Callbacks resumed, stop polling")
+            self.polling = False
+            self._poll_interval = CONST.POLL_INTERVAL
+            self._register_backoff = CONST.POLL_INTERVAL
+            self.update_interval = timedelta(seconds=CONST.PUSH_CHECK_INTERVAL)
+
+    async def _async_reload_failed(self) -> None:
+        """Fetch the functions whose values failed to load again."""
+        known: set[str] = set(self.gira_api.function_uids())
+        uids: list[str] = [uid for uid in self.gira_api.failed_values if uid in known]
+        try:
+            changed, failed = await self.gira_api.get_values(uids)
+        except (aiohttp.ClientError, GiraApiError, TimeoutError) as err:
+            changed, failed = set(), dict.fromkeys(uids, err)
+        self.gira_api.failed_values = failed
+        self.async_update_functions(changed)
+        if failed:
+            self._reload_backoff = min(
+                self._reload_backoff * 2, CONST.POLL_MAX_INTERVAL
+            )
+            _LOGGER.debug("Failed to reload the values of %d functions", len(failed))
+        else:
+            self._reload_backoff = CONST.POLL_INTERVAL
+        self._next_reload = time.monotonic() + self._reload_backoff
+
+    async def _async_update_data(self) -> ValueStore:
+        """Reload failed values and poll the device while callbacks are quiet."""
+        if self.gira_api.failed_values and time.monotonic() >= self._next_reload:
+            await self._async_reload_failed()
+
+        if not self.adaptive_polling or self.push_healthy:
+            return self.gira_api.all_values
+
+        if not self.polling:
+            _LOGGER.warning(
+                "No callbacks for %d s, polling the device", CONST.PUSH_TIMEOUT
+            )
+            self.polling = True
+            self._next_register = 0.0
+        try:
+            if time.monotonic() >= self._next_register:
+                await self.gira_api.register_callback()
+                self._next_register = time.monotonic() + self._register_backoff
+                self._register_backoff = min(
+                    self._register_backoff * 2, CONST.POLL_MAX_INTERVAL
+                )
+            changed = await self._async_poll_batch()
+        except (aiohttp.ClientError, GiraApiError, TimeoutError) as err:
+            self._set_poll_interval(self._poll_interval * 2)
+            raise UpdateFailed(f"Polling failed: {err}") from err
+
+        if changed:
+            # the callbacks missed these changes, poll fast and re-register
+            self._set_poll_interval(CONST.POLL_INTERVAL)
+            self._next_register = 0.0
+            self.async_update_functions(changed)
+        else:
+            self._set_poll_interval(self._poll_interval * 2)
         return self.gira_api.all_values
+
+    async def _async_poll_batch(self) -> set[str]:
+        """Fetch the next slice of functions, returning the changed ones."""
+        uids: list[str] = self.gira_api.function_uids()
+        if not uids:
+            return set()
+        start = self._poll_cursor % len(uids)
+        batch: list[str] = (uids[start:] + uids[:start])[: CONST.POLL_BATCH]
+        self._poll_cursor = start + len(batch)
+        changed, failed = await self.gira_api.get_values(batch)
+        if failed and len(failed) == len(batch):
+            raise next(iter(failed.values()))
+        return changed
+
+    def _set_poll_interval(self, seconds: float) -> None:
+        """Set the interval of the next poll within the backoff limits."""
+        self._poll_interval = min(
+            max(seconds, CONST.POLL_INTERVAL), CONST.POLL_MAX_INTERVAL
+        )
+        self.update_interval = timedelta(seconds=self._poll_interval)
+
+    @callback
+    def _async_apply_values(self, values: dict[str, Any]) -> None:
+        """Store the values from the ingest queue and notify their entities."""
+        store = self.gira_api.all_values
+        confirm = self.writes.confirm
+        updated: set[str] = set()
+        for uid, value in values.items():
+            # the device reports every value it applied, including written ones
+            if not confirm(uid, value):
+                continue
+            function_uid = store.set(uid, value)
+            if function_uid is not None:
+                updated.add(function_uid)
+        self.async_update_functions(updated)
+
+    async def async_set_value(
+        self, uid: str, value: Any, optimistic: bool = True
+    ) -> None:
+        """Write a datapoint, showing the value until the device confirms it.
+
+        Without `optimistic`, the value is only sent and the entity follows
+        the values the device reports, like the travel of a cover.
+        """
+        if not optimistic:
+            await self.gira_api.set_val(uid, value)
+            return
+        self.writes.track(uid, value)
+        try:
+            await self.gira_api.set_val(uid, value)
+        except Exception:
+            self.writes.rollback(uid)
+            raise
+
+    @callback
+    def async_add_function_listener(
+        self, function_uid: str, update_callback: CALLBACK_TYPE
+    ) -> CALLBACK_TYPE:
+        """Listen for updates of a single function."""
+        listeners = self._function_listeners.setdefault(function_uid, [])
+        listeners.append(update_callback)
+
+        @callback
+        def remove_listener() -> None:
+            """Remove the function listener."""
+            listeners.remove(update_callback)
+
+        return remove_listener
+
+    @callback
+    def async_update_functions(self, function_uids: Iterable[str]) -> None:
+        """Notify only the listeners of the given functions.
+
+        Unlike async_set_updated_data, the other entities are not woken up.
+        """
+        metrics = self.gira_api.metrics
+        for function_uid in function_uids:
+            listeners = self._function_listeners.get(function_uid, ())
+            for update_callback in list(listeners):
+                start = metrics.start()
+                update_callback()
+                metrics.observe("entity_update", start)
@@ -2,9 +2,10 @@
 
 from __future__ import annotations
 
+from collections.abc import Iterable
 import logging
 
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
 from .configentry import MyConfigEntry
@@ -24,17 +25,27 @@ async def async_setup_entry(
 
     coordinator = config_entry.runtime_data.coordinator
     _useless = hass
-    # start with an empty list of entries
-    entries: list[MyCoverEntity] = []
-
     giraAPI: GiraDevice = config_entry.runtime_data.gira_api
-    for cover in giraAPI.gira_covers.values():
-        mycover: MyCoverEntity = MyCoverEntity(
-            myGiraDevice=giraAPI, myGiraCover=cover, coordinator=coordinator
+
+    @callback
+    def async_add_covers(uids: Iterable[str]) -> None:
+        """Add the entities of the given functions."""
+        # start with an empty list of entries
+        entries: list[MyCoverEntity] = []
+        for uid in uids:
+            cover = giraAPI.gira_covers.get(uid)
+            if cover is None:
+                continue
+            mycover: MyCoverEntity = MyCoverEntity(
+                myGiraDevice=giraAPI, myGiraCover=cover, coordinator=coordinator
+            )
+            config_entry.runtime_data.entities[uid] = mycover
+            entries.append(mycover)
+
+        async_add_entities(
+            entries,
+            update_before_add=True,
         )
-        entries.append(mycover)
 
-    async_add_entities(
-        entries,
-        update_before_add=True,
-    )
+    config_entry.runtime_data.entity_adders["cover"] = async_add_covers
+    async_add_covers(giraAPI.gira_covers)
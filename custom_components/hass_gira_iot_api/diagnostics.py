@@ -0,0 +1,41 @@
+"""Diagnostics support."""
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.core import HomeAssistant
+
+from .configentry import MyConfigEntry
+from .const import CONF
+from .gira_device import GiraDevice
+
+TO_REDACT: set[str] = {CONF.PASSWORD, CONF.USERNAME}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: MyConfigEntry
+) -> dict[str, Any]:
+    """Get the diagnostics of a config entry."""
+    _useless = hass
+    giraAPI: GiraDevice = entry.runtime_data.gira_api
+    return {
+        "entry": async_redact_data(entry.as_dict(), TO_REDACT),
+        "functions": {
+            "lights": len(giraAPI.gira_lights),
+            "climates": len(giraAPI.gira_climates),
+            "covers": len(giraAPI.gira_covers),
+        },
+        "values": {
+            "count": len(giraAPI.all_values),
+            "memory_bytes": giraAPI.all_values.memory_footprint(),
+            "failed_functions": list(giraAPI.failed_values),
+        },
+        "breaker": {
+            "open": giraAPI.breaker.is_open,
+            "opened": giraAPI.breaker.opened,
+        },
+        "scheduler": giraAPI.scheduler.as_dict(),
+        "ingest": entry.runtime_data.coordinator.ingest.as_dict(),
+        "writes": entry.runtime_data.coordinator.writes.as_dict(),
+        "metrics": giraAPI.metrics.as_dict(),
+    }
@@ -1,5 +1,8 @@
 """Entity classes used in this integration."""
 
+import asyncio
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass
 import logging
 from typing import Any
 
@@ -11,19 +14,112 @@ from homeassistant.components.light import (
     ColorMode,
     LightEntity,
 )
-from homeassistant.const import UnitOfTemperature
+from homeassistant.components.sensor import SensorEntity, SensorEntityDescription
+from homeassistant.const import EntityCategory, UnitOfTemperature
 from homeassistant.core import callback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
+from .command_debouncer import CommandDebouncer
 from .const import CONST
 from .coordinator import MyCoordinator
 from .gira_device import GiraClimate, GiraCover, GiraDevice, GiraLight
+from .metrics import Metrics
+from .value_store import Value
 
 logging.basicConfig()
 log: logging.Logger = logging.getLogger(name=__name__)
 
+# attribute set by a datapoint and the conversion of its value, a converted
+# value of None leaves the attribute unchanged
+type Setter = tuple[str, Callable[[Value], Any]]
 
-class MyLightEntity(LightEntity, CoordinatorEntity):
+_UNSET = object()
+
+
+def _brightness(value: Value) -> int | None:
+    """Convert a brightness in percent to the range of HA."""
+    return None if value is None else int(value / 100 * 255)
+
+
+def _bool(value: Value) -> bool | None:
+    """Convert a value to bool."""
+    return None if value is None else bool(value)
+
+
+def _int(value: Value) -> int | None:
+    """Convert a value to int."""
+    return None if value is None else int(value)
+
+
+def _inverted_position(value: Value) -> int | None:
+    """Convert a Gira position (0 is open) to a HA position (100 is open)."""
+    return None if value is None else 100 - int(value)
+
+
+def _unchanged(value: Value) -> Value:
+    """Keep a value as it is."""
+    return value
+
+
+class MyGiraEntity(CoordinatorEntity):
+    """Base class of the entities of a Gira function.
+
+    Besides the coordinator updates, the entity is notified when a callback
+    changes one of the datapoints of its function. Each entity maps its
+    datapoints to setters once; an update only converts the datapoints whose
+    value changed and skips the state write if no attribute changed.
+    """
+
+    uid: str
+    _setters: dict[str, Setter]
+    _applied: dict[str, Value]
+    _written: tuple[Any, ...] | None = None
+
+    def _compile_setters(self, setters: Mapping[str, Setter]) -> None:
+        """Set the datapoint uid -> setter table, skipping missing datapoints."""
+        self._setters = {uid: setter for uid, setter in setters.items() if uid}
+        self._applied = {}
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Apply the changed datapoints and write the state if it changed."""
+        store = self.coordinator.data
+        applied = self._applied
+        for uid, (attribute, convert) in self._setters.items():
+            value = store.get(uid)
+            if applied.get(uid, _UNSET) == value:
+                continue
+            applied[uid] = value
+            converted = convert(value)
+            if converted is not None:
+                setattr(self, attribute, converted)
+
+        state = (
+            self.available,
+            *(
+                getattr(self, attribute, None)
+                for attribute, _ in self._setters.values()
+            ),
+        )
+        if state == self._written:
+            return
+        self._written = state
+        self.async_write_ha_state()
+
+    async def async_added_to_hass(self) -> None:
+        """Register the function listener."""
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            self.coordinator.async_add_function_listener(
+                self.uid, self._handle_coordinator_update
+            )
+        )
+        # coordinator refreshes only notify on changes, so render the
+        # values known so far
+        self._handle_coordinator_update()
+
+
+class MyLightEntity(LightEntity, MyGiraEntity):
     """MyLight Entity Class."""
 
     _attr_should_poll: bool = True
@@ -40,6 +136,11 @@ class MyLightEntity(LightEntity, CoordinatorEntity):
         CoordinatorEntity.__init__(self, coordinator=coordinator)
         self._GiraDevice: GiraDevice = myGiraDevice
         self._GiraLight: GiraLight = myGiraLight
+        self._commands: CommandDebouncer = CommandDebouncer(
+            send=coordinator.async_set_value, settle=CONST.LIGHT_COMMAND_SETTLE
+        )
+        # counts the turn offs, a dim they discarded must not switch on
+        self._turned_off: int = 0
         self.uid = myGiraLight.uid
         self.name = myGiraLight.name
         self._attr_unique_id = CONST.DOMAIN + "_" + myGiraLight.uid
@@ -47,6 +148,13 @@ class MyLightEntity(LightEntity, CoordinatorEntity):
         # self._attr_brightness: int | None = myGiraLight.DimmVal
         # self._attr_color_temp_kelvin: int | None = myGiraLight.TuneVal
         # print(myGiraLight.OnOffVal)
+        self._compile_setters(
+            {
+                myGiraLight.OnOffUid: ("_attr_is_on", _bool),
+                myGiraLight.DimmUid: ("_attr_brightness", _brightness),
+                myGiraLight.TuneUid: ("_attr_color_temp_kelvin", _int),
+            }
+        )
 
         # OnOff Device
         if myGiraLight.DimmUid == "" and myGiraLight.TuneUid == "":
@@ -68,41 +176,43 @@ class MyLightEntity(LightEntity, CoordinatorEntity):
             pass
 
     async def async_turn_on(self, **kwargs):
-        """Turn device on."""
+        """Turn device on.
+
+        The settled brightness and colour temperature are sent first, so the
+        light does not flash up at its old brightness. It is switched on
+        afterwards only if it is off, or if nothing else was changed.
+        """
+        turned_off: int = self._turned_off
+        writes = []
         for key, value in kwargs.items():
             match key:
                 case "brightness":
                     brightness: int = value / 255 * 100
-                    await self._GiraDevice.set_val(self._GiraLight.DimmUid, brightness)
+                    writes.append(
+                        self._commands.command(self._GiraLight.DimmUid, brightness)
+                    )
                 case "color_temp_kelvin":
-                    await self._GiraDevice.set_val(self._GiraLight.TuneUid, value)
-        await self._GiraDevice.set_val(self._GiraLight.OnOffUid, 1)
+                    writes.append(
+                        self._commands.command(self._GiraLight.TuneUid, value)
+                    )
+        await asyncio.gather(*writes)
+        if (
+            not self._GiraLight.OnOffUid
+            or (writes and self._attr_is_on)
+            or turned_off != self._turned_off
+        ):
+            return
+        await self.coordinator.async_set_value(self._GiraLight.OnOffUid, 1)
 
     async def async_turn_off(self, **kwargs):
         """Turn device off."""
-        await self._GiraDevice.set_val(self._GiraLight.OnOffUid, 0)
+        # a pending dim must not switch the light on again
+        self._turned_off += 1
+        self._commands.discard(self._GiraLight.DimmUid, self._GiraLight.TuneUid)
+        await self.coordinator.async_set_value(self._GiraLight.OnOffUid, 0)
 
-    @callback
-    def _handle_coordinator_update(self) -> None:
-        """Handle updated data from the coordinator."""
-        data: dict[str, Any] = self.coordinator.data[self.uid]
-        for key, value in data.items():
-            match key:
-                case self._GiraLight.OnOffUid:
-                    if value == "1":
-                        self._attr_is_on = True
-                    else:
-                        self._attr_is_on = False
-                case self._GiraLight.DimmUid:
-                    if value != "":
-                        self._attr_brightness = int(float(value) / 100 * 255)
-                case self._GiraLight.TuneUid:
-                    if value != "":
-                        self._attr_color_temp_kelvin = int(float(value))
-        self.async_write_ha_state()
 
-
-class MyClimateEntity(ClimateEntity, CoordinatorEntity):
+class MyClimateEntity(ClimateEntity, MyGiraEntity):
     """MyLight Entity Class."""
 
     _attr_should_poll: bool = True
@@ -126,6 +236,12 @@ class MyClimateEntity(ClimateEntity, CoordinatorEntity):
         self._GiraClimate: GiraClimate = myGiraClimate
         self._attr_name = myGiraClimate.name
         self._attr_unique_id = CONST.DOMAIN + "_" + myGiraClimate.uid
+        self._compile_setters(
+            {
+                myGiraClimate.CurrentUid: ("_attr_current_temperature", _unchanged),
+                myGiraClimate.SetPointUid: ("_attr_target_temperature", _unchanged),
+            }
+        )
 
     async def async_set_temperature(self, **kwargs):
         """Set new target temperature."""
@@ -133,25 +249,8 @@ class MyClimateEntity(ClimateEntity, CoordinatorEntity):
             ...
             # print(arg)
 
-    @callback
-    def _handle_coordinator_update(self) -> None:
-        """Handle updated data from the coordinator."""
-        data: dict[str, Any] = self.coordinator.data[self.uid]
-        for key, value in data.items():
-            match key:
-                case self._GiraClimate.CurrentUid:
-                    if value != "":
-                        self._attr_current_temperature = float(value)
-                case self._GiraClimate.SetPointUid:
-                    if value != "":
-                        self._attr_target_temperature = float(value)
-                case self._GiraClimate.ModeUid:
-                    if value != "":
-                        print(f"{value}")
-        self.async_write_ha_state()
 
-
-class MyCoverEntity(CoverEntity, CoordinatorEntity):
+class MyCoverEntity(CoverEntity, MyGiraEntity):
     """MyLight Entity Class."""
 
     _attr_should_poll: bool = True
@@ -174,22 +273,41 @@ class MyCoverEntity(CoverEntity, CoordinatorEntity):
         self.uid = myGiraCover.uid
         self._GiraDevice: GiraDevice = myGiraDevice
         self._GiraCover: GiraCover = myGiraCover
+        self._commands: CommandDebouncer = CommandDebouncer(
+            send=self._send_position, settle=CONST.COVER_COMMAND_SETTLE
+        )
         self._attr_name = myGiraCover.name
         self._attr_unique_id = CONST.DOMAIN + "_" + myGiraCover.uid
 
         self._attr_is_closed = None
+        self._compile_setters(
+            {
+                myGiraCover.PositionUid: (
+                    "_attr_current_cover_position",
+                    _inverted_position,
+                ),
+                myGiraCover.SlatPositionUid: (
+                    "_attr_current_cover_tilt_position",
+                    _int,
+                ),
+            }
+        )
+
+    async def _send_position(self, uid: str, position: int) -> None:
+        """Send a target position, the cover reports its travel as it moves."""
+        await self.coordinator.async_set_value(uid, position, optimistic=False)
 
     async def async_open_cover(self, **kwargs):
         """Open the cover."""
         # print(**kwargs)
-        await self._GiraDevice.set_val(uid=self._GiraCover.UpDownUid, val=0)
-        self.async_write_ha_state()
+        self._commands.discard(self._GiraCover.PositionUid)
+        await self.coordinator.async_set_value(self._GiraCover.UpDownUid, 0)
 
     async def async_close_cover(self, **kwargs):
         """Close cover."""
         # print(f"{self._GiraCover.UpDownUid}:1")
-        await self._GiraDevice.set_val(uid=self._GiraCover.UpDownUid, val=1)
-        self.async_write_ha_state()
+        self._commands.discard(self._GiraCover.PositionUid)
+        await self.coordinator.async_set_value(self._GiraCover.UpDownUid, 1)
 
     async def async_set_cover_position(self, **kwargs):
         """Move the cover to a specific position."""
@@ -199,47 +317,59 @@ class MyCoverEntity(CoverEntity, CoordinatorEntity):
                     # print(f"{key}:{value}")
                     position: int = int(value)
                     position = 100 - position
-                    await self._GiraDevice.set_val(
-                        uid=self._GiraCover.PositionUid, val=position
-                    )
-        self.async_write_ha_state()
+                    # slider moves only send the latest target
+                    await self._commands.command(self._GiraCover.PositionUid, position)
 
     async def async_stop_cover(self, **kwargs):
         """Stop the cover."""
-        await self._GiraDevice.set_val(uid=self._GiraCover.StepUpDownUid, val=1)
-        self.async_write_ha_state()
+        self._commands.discard(self._GiraCover.PositionUid)
+        await self.coordinator.async_set_value(self._GiraCover.StepUpDownUid, 1)
 
     async def async_open_cover_tilt(self, **kwargs):
         """Open the cover tilt."""
-        await self._GiraDevice.set_val(uid=self._GiraCover.StepUpDownUid, val=0)
-        self.async_write_ha_state()
+        await self.coordinator.async_set_value(self._GiraCover.StepUpDownUid, 0)
 
     async def async_close_cover_tilt(self, **kwargs):
         """Close the cover tilt."""
-        await self._GiraDevice.set_val(uid=self._GiraCover.StepUpDownUid, val=1)
-        self.async_write_ha_state()
+        await self.coordinator.async_set_value(self._GiraCover.StepUpDownUid, 1)
 
     async def async_set_cover_tilt_position(self, **kwargs):
         """Move the cover tilt to a specific position."""
-        await self._GiraDevice.set_val(uid=self._GiraCover.SlatPositionUid, val=1)
-        self.async_write_ha_state()
+        await self.coordinator.async_set_value(self._GiraCover.SlatPositionUid, 1)
 
     async def async_stop_cover_tilt(self, **kwargs):
         """Stop the cover."""
-        await self._GiraDevice.set_val(uid=self._GiraCover.StepUpDownUid, val=1)
-        self.async_write_ha_state()
+        await self.coordinator.async_set_value(self._GiraCover.StepUpDownUid, 1)
 
-    @callback
-    def _handle_coordinator_update(self) -> None:
-        """Handle updated data from the coordinator."""
-        data: dict[str, Any] = self.coordinator.data[self.uid]
-        for key, value in data.items():
-            match key:
-                case self._GiraCover.PositionUid:
-                    if value != "":
-                        self._attr_current_cover_position = 100 - int(float(value))
-                case self._GiraCover.SlatPositionUid:
-                    if value != "":
-                        self._attr_current_cover_tilt_position = int(float(value))
 
-        self.async_write_ha_state()
+@dataclass(frozen=True, kw_only=True)
+class MyMetricsSensorEntityDescription(SensorEntityDescription):
+    """Description of a metrics sensor."""
+
+    value_fn: Callable[[Metrics], float | int | None]
+
+
+class MyMetricsSensor(SensorEntity):
+    """Diagnostic sensor showing a performance metric."""
+
+    entity_description: MyMetricsSensorEntityDescription
+
+    _attr_should_poll: bool = True
+    _attr_has_entity_name: bool = True
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+
+    def __init__(
+        self,
+        myGiraDevice: GiraDevice,
+        entry_id: str,
+        description: MyMetricsSensorEntityDescription,
+    ) -> None:
+        """MyMetricsSensor init."""
+        self.entity_description = description
+        self._GiraDevice: GiraDevice = myGiraDevice
+        self._attr_unique_id = f"{CONST.DOMAIN}_{entry_id}_{description.key}"
+
+    @property
+    def native_value(self) -> float | int | None:
+        """Get the current value of the metric."""
+        return self.entity_description.value_fn(self._GiraDevice.metrics)
@@ -1,249 +1,527 @@
 """Gira IOT Device Class."""
 
-import builtins
+import asyncio
+from collections.abc import Callable
 import contextlib
 import logging
-from typing import Any
+from typing import Any, NamedTuple
 
 import aiohttp
 
+from . import json_codec
+from .const import CONST
+from .http_session import create_session
+from .metrics import Metrics
+from .request_scheduler import Priority, RequestScheduler
+from .resilience import CircuitBreaker, backoff_delay
+from .storage import GiraStorage
+from .value_store import ValueStore
+from .write_batcher import WriteBatcher
+
 logging.basicConfig()
 log: logging.Logger = logging.getLogger(name=__name__)
 
 
+def compact_ui(ui: dict[str, Any]) -> dict[str, Any]:
+    """Reduce the expanded uiconfig to the parts used by this integration."""
+    return {
+        "functions": [
+            {
+                "uid": function["uid"],
+                "displayName": function["displayName"],
+                "functionType": function.get("functionType", ""),
+                "channelType": function.get("channelType", ""),
+                "dataPoints": [
+                    {"uid": dataPoint["uid"], "name": dataPoint["name"]}
+                    for dataPoint in function["dataPoints"]
+                ],
+            }
+            for function in ui["functions"]
+        ],
+    }
+
+
+def parse_ui(body: bytes) -> dict[str, Any]:
+    """Decode the uiconfig and keep only the parts used by this integration.
+
+    Runs in an executor; the full document is released on return.
+    """
+    return compact_ui(json_codec.loads(body))
+
+
+class GiraApiError(Exception):
+    """Error returned by the Gira IOT Device."""
+
+
+class GiraAuthError(GiraApiError):
+    """The Gira IOT Device rejected the credentials or the token."""
+
+
+class GiraUnavailableError(GiraApiError):
+    """The Gira IOT Device failed to answer or is considered down."""
+
+
+class GiraRequestError(GiraApiError):
+    """The Gira IOT Device rejected a request."""
+
+
 class GiraDevice:
     """Gira IOT Device Class."""
 
-    def __init__(self, host: str, user: str, password: str) -> None:
+    def __init__(
+        self,
+        host: str,
+        user: str,
+        password: str,
+        storage: GiraStorage | None = None,
+        metrics: Metrics | None = None,
+        session: aiohttp.ClientSession | None = None,
+        callback_url: str | None = None,
+    ) -> None:
         """Gira IOT Device Class Constructor."""
         self._host: str = host
         self._user: str = user
         self._password: str = password
         self._token: str | None = None
+        self._storage: GiraStorage | None = storage
+        self.callback_url: str | None = callback_url
+        self.metrics: Metrics = metrics if metrics is not None else Metrics()
         self._ui: dict[str, Any] = {}
-        self._functions: dict[str, Any] = []
-        self.all_values: dict[str, dict[str, Any]] = {}
+        self._functions: dict[str, Any] = {}
+        self.all_values: ValueStore = ValueStore()
+        self.failed_values: dict[str, BaseException] = {}
         self.gira_lights: dict[str, GiraLight] = {}
         self.gira_climates: dict[str, GiraClimate] = {}
         self.gira_covers: dict[str, GiraCover] = {}
-        self._session: aiohttp.ClientSession = aiohttp.ClientSession()
+        # a session passed in is shared and closed by its owner
+        self._own_session: bool = session is None
+        self._session: aiohttp.ClientSession = (
+            session if session is not None else create_session()
+        )
         self._auth: aiohttp.BasicAuth = aiohttp.BasicAuth(
             login=self._user,
             password=self._password,
         )
+        self._writer: WriteBatcher = WriteBatcher(send=self._put_values)
+        self.breaker: CircuitBreaker = CircuitBreaker()
+        self.scheduler: RequestScheduler = RequestScheduler()
+        self._connect_lock: asyncio.Lock = asyncio.Lock()
 
-    async def connect(self) -> None:
-        """Connect to the Gira IOT Device."""
+    async def _request(
+        self,
+        method: str,
+        endpoint: str,
+        url: str,
+        parse: Callable[[bytes], Any] | None = None,
+        payload: Any = None,
+        reauth: bool = True,
+        priority: Priority = Priority.REFRESH,
+        **kwargs: Any,
+    ) -> Any:
+        """Send a request to the device and decode its json response.
+
+        A `payload` is sent as json body. Returns None if the response has no
+        json body. Reads are retried with a jittered backoff while the device
+        does not answer. If the device rejects the token, the client connects
+        again and the request is repeated once, unless `reauth` is False;
+        GiraAuthError is raised otherwise. While the circuit breaker is open,
+        GiraUnavailableError is raised without sending anything. Other
+        rejected requests raise GiraRequestError. Every try waits for a slot
+        of the scheduler in its `priority` class.
+
+        With `parse`, the body is read in chunks and handed to `parse` in an
+        executor instead of being decoded on the event loop.
+        """
+        if payload is not None:
+            kwargs["data"] = json_codec.dumps(payload)
+            kwargs["headers"] = {"Content-Type": json_codec.CONTENT_TYPE}
+        attempts: int = CONST.RETRY_ATTEMPTS if method == "GET" else 1
+        attempt: int = 0
+        token: str | None = self._token
+        while True:
+            if not self.breaker.allow():
+                raise GiraUnavailableError(f"{self._host} is unavailable")
+            try:
+                async with self.scheduler.slot(priority):
+                    result = await self._send(method, endpoint, url, parse, **kwargs)
+            except GiraAuthError:
+                self.breaker.success()
+                if not reauth or token is None or token not in url:
+                    raise
+                reauth = False
+                await self._reconnect(token)
+                # the token is part of the url
+                url = url.replace(token, self._token)
+                token = self._token
+                continue
+            except (aiohttp.ClientError, TimeoutError, GiraUnavailableError):
+                self.breaker.failure()
+                attempt += 1
+                if attempt >= attempts:
+                    raise
+                await asyncio.sleep(backoff_delay(attempt - 1))
+                continue
+            except GiraRequestError:
+                self.breaker.success()
+                raise
+            self.breaker.success()
+            return result
+
+    async def _send(
+        self,
+        method: str,
+        endpoint: str,
+        url: str,
+        parse: Callable[[bytes], Any] | None,
+        **kwargs: Any,
+    ) -> Any:
+        """Send a request once, see _request.
+
+        The request is timed and counted under `endpoint` in the metrics.
+        """
+        start: float = self.metrics.start()
+        try:
+            async with self._session.request(method, url, **kwargs) as response:
+                if response.status == 401:
+                    raise GiraAuthError(f"{method} {endpoint} was not authorized")
+                if response.status >= 500:
+                    raise GiraUnavailableError(
+                        f"{method} {endpoint} failed with {response.status}"
+                    )
+                if response.status >= 400:
+                    raise GiraRequestError(
+                        f"{method} {endpoint} was rejected with {response.status}"
+                    )
+                if response.content_type != "application/json":
+                    return None
+                if parse is None:
+                    return json_codec.loads(await response.read())
+                body = bytearray()
+                async for chunk in response.content.iter_chunked(CONST.HTTP_CHUNK_SIZE):
+                    body += chunk
+            return await asyncio.get_running_loop().run_in_executor(
+                None, parse, bytes(body)
+            )
+        except Exception:
+            self.metrics.error(endpoint)
+            raise
+        finally:
+            self.metrics.observe(endpoint, start)
+
+    async def _reconnect(self, rejected_token: str) -> None:
+        """Connect again after the device rejected a token.
+
+        Concurrent requests rejected with the same token connect only once.
+        """
+        async with self._connect_lock:
+            if self._token != rejected_token:
+                return
+            log.info("Token was rejected, connecting again")
+            await self.connect()
+            # callbacks are registered per client; a rejection here must not
+            # reconnect again while the lock is held
+            try:
+                await self.register_callback(reauth=False)
+            except (aiohttp.ClientError, GiraApiError, TimeoutError) as err:
+                log.warning("Failed to register the callbacks again: %s", err)
+
+    async def connect(self) -> str | None:
+        """Connect to the Gira IOT Device.
+
+        A token stored by an earlier run is reused as long as the device
+        accepts it. A new client is only registered if the device rejects it.
+        Returns the uiconfig identifier if it was fetched to check the token.
+        """
+        stored_token: str | None = None
+        if self._storage is not None:
+            stored_token = self._storage.token
+        if stored_token is not None:
+            self._token = stored_token
+            try:
+                ui_uid: str = await self.get_ui_uid(reauth=False)
+            except GiraAuthError:
+                log.info("Stored token was rejected, registering a new client")
+            else:
+                return ui_uid
 
-        payload = '{"client":"de.madone.x1client"}'
         url: str = f"https://{self._host}/api/clients"
-        response = await self._session.post(
-            url=url, auth=self._auth, data=payload, ssl=False
+        data = await self._request(
+            "POST",
+            "http:clients",
+            url,
+            auth=self._auth,
+            payload={"client": "de.madone.x1client"},
+            reauth=False,
         )
-        json = await response.json()
-        token = json["token"]
+        token = data["token"]
         self._token = token
-
-    async def get_ui(self):
-        """Get the UI json."""
-        url = f"https://{self._host}/api/v2/uiconfig?expand=[dataPointFlasgs,parameters,locations,trades&token={self._token}"
-        response = await self._session.get(url=url, auth=self._auth, ssl=False)
-        json = await response.json()
-        self._ui = json
-        # log.warning(msg=json)
+        if self._storage is not None:
+            await self._storage.async_save_token(token)
+        if stored_token is not None:
+            await self._unregister(stored_token)
+        return None
+
+    async def disconnect(self) -> None:
+        """Unregister the client from the Gira IOT Device."""
+        if self._token is None and self._storage is not None:
+            self._token = self._storage.token
+        if self._token is None:
+            return
+        await self._unregister(self._token)
+        self._token = None
+        if self._storage is not None:
+            await self._storage.async_save_token(None)
+
+    async def _unregister(self, token: str) -> None:
+        """Remove a client registration, ignoring already removed ones."""
+        url: str = f"https://{self._host}/api/clients/{token}"
+        with contextlib.suppress(GiraAuthError, GiraRequestError):
+            await self._request("DELETE", "http:clients", url, reauth=False)
+
+    async def get_ui_uid(self, reauth: bool = True) -> str:
+        """Get the identifier of the current uiconfig."""
+        url = f"https://{self._host}/api/v2/uiconfig/uid?token={self._token}"
+        data = await self._request(
+            "GET", "http:uiconfig_uid", url, auth=self._auth, reauth=reauth
+        )
+        return data["uid"]
+
+    async def get_ui(self, ui_uid: str | None = None):
+        """Get the UI json.
+
+        The full uiconfig is only downloaded if its identifier differs from
+        the one in the storage. An identifier fetched right before, by
+        connect, is passed as `ui_uid` instead of asking the device again.
+        """
+        if ui_uid is None:
+            ui_uid = await self.get_ui_uid()
+        if self._storage is not None:
+            ui = self._storage.get_ui(ui_uid)
+            if ui is not None:
+                self._ui = ui
+                return
+
+        # the functions are classified by their channel type, nothing is expanded
+        url = f"https://{self._host}/api/v2/uiconfig?token={self._token}"
+        self._ui = await self._request(
+            "GET", "http:uiconfig", url, parse=parse_ui, auth=self._auth
+        )
+        if self._storage is not None:
+            await self._storage.async_save_ui(ui_uid, self._ui)
 
     async def get_val(self, uid: str) -> int | None:
         """Get the UI json."""
         url = f"https://{self._host}/api/v2/values/{uid}?token={self._token}"
-        response = await self._session.get(url=url, auth=self._auth, ssl=False)
-        json = await response.json()
-        log.warning(json)
+        data = await self._request("GET", "http:values_get", url, auth=self._auth)
+        log.warning(data)
         try:
-            return json["values"][0]["value"]
+            return data["values"][0]["value"]
         except:  # noqa: E722
             return None
 
-    async def get_device_values(self, uid: str) -> dict[str, str | int | float]:
+    async def get_device_values(
+        self, uid: str, priority: Priority = Priority.REFRESH
+    ) -> dict[str, str | int | float]:
         """Get the UI json."""
         values: dict[str, str | int | float] = {}
         url: str = f"https://{self._host}/api/v2/values/{uid}?token={self._token}"
-        response = await self._session.get(url=url, auth=self._auth, ssl=False)
-        json = await response.json()
-        for value in json["values"]:
+        data = await self._request(
+            "GET", "http:values_get", url, auth=self._auth, priority=priority
+        )
+        for value in data["values"]:
             values[value["uid"]] = value["value"]
         return values
 
-    async def get_all_values(self):
-        """Get all the values of the GiraDevice."""
-        self.all_values = {}
-        lights: list[str] = self._ui["trades"][0]["functions"]
-        for light_uid in lights:
-            values = {}
-            values = await self.get_device_values(light_uid)
-            self.all_values[light_uid] = values
-
-        climates: list[str] = self._ui["trades"][3]["functions"]
-        for climate_uid in climates:
-            values = {}
-            values = await self.get_device_values(climate_uid)
-            self.all_values[climate_uid] = values
-
-        covers: list[str] = self._ui["trades"][2]["functions"]
-        for cover_uid in covers:
-            values = {}
-            values = await self.get_device_values(cover_uid)
-            self.all_values[cover_uid] = values
+    def function_uids(self) -> list[str]:
+        """Get the uids of all lights, climates and covers."""
+        return [*self.gira_lights, *self.gira_climates, *self.gira_covers]
+
+    async def get_values(
+        self,
+        uids: list[str],
+        concurrency: int = CONST.FETCH_CONCURRENCY,
+        timeout: float = CONST.FETCH_TIMEOUT,
+        priority: Priority = Priority.REFRESH,
+    ) -> tuple[set[str], dict[str, BaseException]]:
+        """Get the values of the given functions.
+
+        The functions are fetched concurrently with at most `concurrency`
+        requests in flight, each one limited to `timeout` seconds and
+        scheduled with `priority`. A function
+        that fails keeps its previous values. Returns the uids of the
+        functions whose values changed and the failures.
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def fetch(uid: str) -> dict[str, str | int | float]:
+            async with semaphore, asyncio.timeout(timeout):
+                return await self.get_device_values(uid, priority)
+
+        results = await asyncio.gather(
+            *(fetch(uid) for uid in uids), return_exceptions=True
+        )
+
+        changed: set[str] = set()
+        failed: dict[str, BaseException] = {}
+        for uid, result in zip(uids, results, strict=True):
+            if isinstance(result, BaseException):
+                failed[uid] = result
+            elif self.all_values.update_function(uid, result):
+                changed.add(uid)
+        return changed, failed
+
+    async def get_all_values(
+        self,
+        concurrency: int = CONST.FETCH_CONCURRENCY,
+        timeout: float = CONST.FETCH_TIMEOUT,
+    ) -> dict[str, BaseException]:
+        """Get all the values of the GiraDevice.
+
+        See get_values, the requests run in the background priority class.
+        The failures are returned and kept in `failed_values`.
+        """
+        uids: list[str] = self.function_uids()
+        _changed, failed = await self.get_values(
+            uids, concurrency, timeout, Priority.BACKGROUND
+        )
+        self.failed_values = failed
+        log.debug(
+            "Stored %d values in %d bytes",
+            len(self.all_values),
+            self.all_values.memory_footprint(),
+        )
+
+        if failed:
+            log.warning(
+                "Failed to get values of %d/%d functions: %s",
+                len(failed),
+                len(uids),
+                ", ".join(failed),
+            )
+        return failed
+
+    def function_of(self, datapoint_uid: str) -> str | None:
+        """Get the uid of the function owning a datapoint."""
+        return self.all_values.function_of(datapoint_uid)
 
     async def set_val(self, uid: str, val: int) -> None:
-        """Get the UI json."""
-        payload = f"""{{
-                \"values\": [
-                    {{
-                        \"uid\": \"{uid}\",
-                        \"value\": {val}
-                    }}
-                ]
-            }}"""
+        """Set the value of a datapoint.
+
+        Writes issued within CONST.WRITE_WINDOW are sent in one request.
+        """
+        await self._writer.write(uid, val)
+
+    async def _put_values(self, values: dict[str, Any]) -> None:
+        """Write several datapoint values in one request."""
+        payload = {
+            "values": [{"uid": uid, "value": val} for uid, val in values.items()]
+        }
         url = f"https://{self._host}/api/v2/values?token={self._token}"
-        _response = await self._session.put(
-            url=url, auth=self._auth, ssl=False, data=payload
+        await self._request(
+            "PUT",
+            "http:values_put",
+            url,
+            auth=self._auth,
+            payload=payload,
+            priority=Priority.INTERACTIVE,
         )
 
-    async def register_callback(self) -> None:
-        """Get the UI json."""
-        ha_ip = "10.10.1.20"
-        callback_port = "8124"
-        payload = f"""{{\"valueCallback\":\"https://{ha_ip}:{callback_port}/value\"}}"""
+    async def register_callback(self, reauth: bool = True) -> None:
+        """Register the callback server at the device.
+
+        `reauth` is passed on to _request, see there.
+        """
+        if self.callback_url is None:
+            return
+        payload = {
+            "valueCallback": f"{self.callback_url}/value",
+            "serviceCallback": f"{self.callback_url}/service",
+        }
         url = f"https://{self._host}/api/clients/{self._token}/callbacks"
-        await self._session.post(url=url, ssl=False, data=payload)
-
-    async def create_gira_lights(self):
-        """Create Gira Lights."""
-        gira_lights: dict[str, GiraLight] = {}
-
-        lights = self._ui["trades"][0]["functions"]
-        for light_uid in lights:
-            light = self._functions[light_uid]
-            name: str = ""
-            OnOffUid: str = ""
-            OnOffVal: bool = False
-            DimmUid: str = ""
-            DimmVal: int = 0
-            TuneUid: str = ""
-            TuneVal: int = 0
-            for dataPoint in light["dataPoints"]:
-                match dataPoint["name"]:
-                    case "OnOff":
-                        OnOffUid: str = dataPoint["uid"]
-                        OnOffVal_Number: str = self.all_values[light_uid][OnOffUid]
-                        if OnOffVal_Number == "1":
-                            OnOffVal: bool = True
-                        else:
-                            OnOffVal: bool = False
-                    case "Brightness":
-                        DimmUid: str = dataPoint["uid"]
-                        with contextlib.suppress(builtins.BaseException):
-                            DimmVal: int = int(
-                                float(self.all_values[light_uid][DimmUid]) / 100 * 255
-                            )
-                        # print(DimmVal)
-                    case "Color-Temperature":
-                        TuneUid: str = dataPoint["uid"]
-                        with contextlib.suppress(builtins.BaseException):
-                            TuneVal: int = int(self.all_values[light_uid][TuneUid])
-                        # print(DimmVal)
-            name: str = light["displayName"]
-            gira_lights[light_uid] = GiraLight(
-                uid=light_uid,
-                name=name,
-                OnOffUid=OnOffUid,
-                OnOffVal=OnOffVal,
-                DimmUid=DimmUid,
-                DimmVal=DimmVal,
-                TuneUid=TuneUid,
-                TuneVal=TuneVal,
-            )
-        self.gira_lights: dict[str, GiraLight] = gira_lights
-
-    def create_gira_climates(self):
-        """Create Gira Lights."""
-        gira_climates = {}
-
-        climates = self._ui["trades"][3]["functions"]
-        for climate_uid in climates:
-            climate = self._functions[climate_uid]
-            name: str = ""
-            CurrentUid: str = ""
-            SetPointUid: str = ""
-            ModeUid: str = ""
-            for dataPoint in climate["dataPoints"]:
-                match dataPoint["name"]:
-                    case "Current":
-                        CurrentUid: str = dataPoint["uid"]
-                    case "Set-Point":
-                        SetPointUid: str = dataPoint["uid"]
-                    case "Mode":
-                        ModeUid: str = dataPoint["uid"]
-            name: str = climate["displayName"]
-            gira_climates[climate_uid] = GiraClimate(
-                uid=climate_uid,
-                name=name,
-                CurrentUid=CurrentUid,
-                SetPointUid=SetPointUid,
-                ModeUid=ModeUid,
-            )
-        self.gira_climates = gira_climates
-
-    def create_gira_covers(self):
-        """Create Gira Lights."""
-        gira_covers = {}
-
-        covers = self._ui["trades"][2]["functions"]
-        for cover_uid in covers:
-            cover = self._functions[cover_uid]
-            name: str = ""
-            StepUpDownUid: str = ""
-            UpDownUid: str = ""
-            PositionUid: str = ""
-            SlatPositionUid: str = ""
-            for dataPoint in cover["dataPoints"]:
-                match dataPoint["name"]:
-                    case "Step-Up-Down":
-                        StepUpDownUid: str = dataPoint["uid"]
-                    case "Up-Down":
-                        UpDownUid: str = dataPoint["uid"]
-                    case "Position":
-                        PositionUid: str = dataPoint["uid"]
-                    case "Slat-Position":
-                        SlatPositionUid: str = dataPoint["uid"]
-            name: str = cover["displayName"]
-            gira_covers[cover_uid] = GiraCover(
-                uid=cover_uid,
-                name=name,
-                StepUpDownUid=StepUpDownUid,
-                UpDownUid=UpDownUid,
-                PositionUid=PositionUid,
-                SlatPositionUid=SlatPositionUid,
-            )
-        self.gira_covers = gira_covers
+        await self._request(
+            "POST", "http:callbacks", url, payload=payload, reauth=reauth
+        )
 
-    def create_functions(self):
-        """Create a dict with the functions."""
-        functions = {}
+    def create_functions(self) -> None:
+        """Index the functions and build the models of the supported ones.
+
+        A single pass over the uiconfig: the channel type of a function selects
+        its handler in FUNCTION_HANDLERS, which maps the datapoint names to the
+        arguments of the model. Functions of other channel types, or of a
+        function type the handler does not accept, are skipped.
+        """
+        functions: dict[str, Any] = {}
+        models: dict[str, dict[str, Any]] = {
+            platform: {} for platform in ("light", "climate", "cover")
+        }
         for function in self._ui["functions"]:
-            functions[function["uid"]] = function
+            uid: str = function["uid"]
+            functions[uid] = function
+            handler = FUNCTION_HANDLERS.get(function.get("channelType", ""))
+            if handler is None or (
+                handler.function_types
+                and function.get("functionType", "") not in handler.function_types
+            ):
+                continue
+            roles: dict[str, str] = {}
+            for dataPoint in function["dataPoints"]:
+                role = handler.roles.get(dataPoint["name"])
+                if role is not None:
+                    roles[role] = dataPoint["uid"]
+            models[handler.platform][uid] = handler.model(
+                uid=uid, name=function["displayName"], **roles
+            )
+            self.all_values.add_function(
+                uid, (dataPoint["uid"] for dataPoint in function["dataPoints"])
+            )
         self._functions = functions
-        # log.warning(functions)
+        self.gira_lights: dict[str, GiraLight] = models["light"]
+        self.gira_climates: dict[str, GiraClimate] = models["climate"]
+        self.gira_covers: dict[str, GiraCover] = models["cover"]
+
+    async def close(self) -> None:
+        """Close the session to the Gira IOT Device, unless it is shared."""
+        if self._own_session:
+            await self._session.close()
+
+    async def refresh_ui(self) -> tuple[set[str], set[str], set[str]]:
+        """Fetch the uiconfig again and rebuild the functions.
+
+        Values of unchanged functions are kept. Returns the uids of the added,
+        removed and changed functions; the values of the added and changed
+        functions are fetched.
+        """
+        old_functions: dict[str, Any] = self._functions
+        await self.get_ui()
+        new_functions: dict[str, Any] = {
+            function["uid"]: function for function in self._ui["functions"]
+        }
+        added: set[str] = new_functions.keys() - old_functions.keys()
+        removed: set[str] = old_functions.keys() - new_functions.keys()
+        changed: set[str] = {
+            uid
+            for uid in new_functions.keys() & old_functions.keys()
+            if new_functions[uid] != old_functions[uid]
+        }
+        for uid in removed | changed:
+            self.all_values.remove_function(uid)
+
+        self.create_functions()
+
+        supported: set[str] = set(self.function_uids())
+        await self.get_values([uid for uid in added | changed if uid in supported])
+        return added, removed, changed
+
+    async def init_structure(self) -> None:
+        """Connect and build the functions, without fetching their values."""
+        ui_uid = await self.connect()
+        await self.get_ui(ui_uid)
+        self.create_functions()
 
     async def init(self):
         """Do some stuff to get the api ready for HA."""
-        await self.connect()
-        await self.get_ui()
+        await self.init_structure()
         await self.get_all_values()
-        self.create_functions()
-        await self.create_gira_lights()
-        self.create_gira_climates()
-        self.create_gira_covers()
         await self.register_callback()
 
 
@@ -254,7 +532,7 @@ class GiraLight:
         self,
         uid: str,
         name: str,
-        OnOffUid: str,
+        OnOffUid: str = "",
         OnOffVal: bool = False,
         DimmUid: str = "",
         DimmVal: int = 0,
@@ -310,3 +588,61 @@ class GiraCover:
         self.UpDownUid: str = UpDownUid
         self.PositionUid: str = PositionUid
         self.SlatPositionUid: str = SlatPositionUid
+
+
+class FunctionHandler(NamedTuple):
+    """Model of the functions of a channel type."""
+
+    platform: str
+    model: type[GiraLight | GiraClimate | GiraCover]
+    # datapoint name -> argument of the model taking the datapoint uid
+    roles: dict[str, str]
+    # accepted function types, any if empty
+    function_types: frozenset[str] = frozenset()
+
+
+LIGHT_ROLES: dict[str, str] = {
+    "OnOff": "OnOffUid",
+    "Brightness": "DimmUid",
+    "Color-Temperature": "TuneUid",
+}
+CLIMATE_ROLES: dict[str, str] = {
+    "Current": "CurrentUid",
+    "Set-Point": "SetPointUid",
+    "Mode": "ModeUid",
+}
+COVER_ROLES: dict[str, str] = {
+    "Step-Up-Down": "StepUpDownUid",
+    "Up-Down": "UpDownUid",
+    "Position": "PositionUid",
+    "Slat-Position": "SlatPositionUid",
+}
+
+# channel type -> handler, new device types only need an entry here
+FUNCTION_HANDLERS: dict[str, FunctionHandler] = {
+    # sockets, pumps and the like share the channel of switched lights
+    "de.gira.schema.channels.Switch": FunctionHandler(
+        "light",
+        GiraLight,
+        LIGHT_ROLES,
+        frozenset({"de.gira.schema.functions.Switch"}),
+    ),
+    "de.gira.schema.channels.KNX.Dimmer": FunctionHandler(
+        "light", GiraLight, LIGHT_ROLES
+    ),
+    "de.gira.schema.channels.DimmerRGBW": FunctionHandler(
+        "light", GiraLight, LIGHT_ROLES
+    ),
+    "de.gira.schema.channels.DimmerWhite": FunctionHandler(
+        "light", GiraLight, LIGHT_ROLES
+    ),
+    "de.gira.schema.channels.BlindWithPos": FunctionHandler(
+        "cover", GiraCover, COVER_ROLES
+    ),
+    "de.gira.schema.channels.KNX.HeatingCoolingSwitchable": FunctionHandler(
+        "climate", GiraClimate, CLIMATE_ROLES
+    ),
+    "de.gira.schema.channels.RoomTemperatureSwitchable": FunctionHandler(
+        "climate", GiraClimate, CLIMATE_ROLES
+    ),
+}
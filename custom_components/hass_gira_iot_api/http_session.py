@@ -0,0 +1,57 @@
+"""Pooled HTTP session to the Gira IOT devices."""
+
+import functools
+import ssl
+
+import aiohttp
+
+from homeassistant.const import EVENT_HOMEASSISTANT_CLOSE
+from homeassistant.core import Event, HomeAssistant, callback
+
+from .const import CONST
+
+DATA_SESSION = f"{CONST.DOMAIN}_session"
+
+
+@functools.cache
+def client_ssl_context() -> ssl.SSLContext:
+    """Get the SSL context for the self-signed device certificates.
+
+    The context is created once and shared by all sessions. Handshakes are
+    saved by the pooled keep-alive connections, not by session resumption.
+    """
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
+    context.check_hostname = False
+    context.verify_mode = ssl.CERT_NONE
+    return context
+
+
+def create_session() -> aiohttp.ClientSession:
+    """Create a session with a connection pool tuned for the gateways."""
+    connector = aiohttp.TCPConnector(
+        ssl=client_ssl_context(),
+        limit_per_host=CONST.HTTP_LIMIT_PER_HOST,
+        keepalive_timeout=CONST.HTTP_KEEPALIVE_TIMEOUT,
+        use_dns_cache=True,
+        ttl_dns_cache=CONST.HTTP_DNS_CACHE_TTL,
+    )
+    return aiohttp.ClientSession(connector=connector)
+
+
+@callback
+def async_get_session(hass: HomeAssistant) -> aiohttp.ClientSession:
+    """Get the session shared by all config entries.
+
+    The session is closed when Home Assistant shuts down.
+    """
+    session: aiohttp.ClientSession | None = hass.data.get(DATA_SESSION)
+    if session is None or session.closed:
+        session = hass.data[DATA_SESSION] = create_session()
+
+        @callback
+        def _async_close_session(_event: Event) -> None:
+            """Close the shared session."""
+            hass.async_create_task(session.close())
+
+        hass.bus.async_listen_once(EVENT_HOMEASSISTANT_CLOSE, _async_close_session)
+    return session
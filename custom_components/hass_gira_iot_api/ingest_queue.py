@@ -0,0 +1,81 @@
+"""Coalescing queue for the values pushed by the device callbacks."""
+
+import asyncio
+from collections.abc import Callable, Iterable
+from typing import Any
+
+from .const import CONST
+
+
+class IngestQueue:
+    """Bounded queue coalescing callback events per datapoint.
+
+    Events are collected for a short frame window and then applied in one
+    go, keeping only the last value per datapoint. Events for unknown
+    datapoints are dropped right away. A full queue is applied at once, so
+    memory stays bounded and a burst does not wait for the window.
+    """
+
+    def __init__(
+        self,
+        apply: Callable[[dict[str, Any]], None],
+        accepts: Callable[[str], bool],
+        window: float = CONST.INGEST_WINDOW,
+        max_size: int = CONST.INGEST_MAX_SIZE,
+    ) -> None:
+        """Init."""
+        self._apply = apply
+        self._accepts = accepts
+        self._window: float = window
+        self._max_size: int = max_size
+        self._pending: dict[str, Any] = {}
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self.received: int = 0
+        self.merged: int = 0
+        self.dropped: int = 0
+        self.applied: int = 0
+        self.full: int = 0
+
+    def put(self, events: Iterable[dict[str, Any]]) -> None:
+        """Queue the events of a callback."""
+        pending = self._pending
+        for event in events:
+            self.received += 1
+            uid = event["uid"]
+            if uid in pending:
+                self.merged += 1
+            elif not self._accepts(uid):
+                self.dropped += 1
+                continue
+            elif len(pending) >= self._max_size:
+                self.full += 1
+                self.flush()
+                pending = self._pending
+            pending[uid] = event["value"]
+
+        if pending and self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(
+                self._window, self.flush
+            )
+
+    def flush(self) -> None:
+        """Apply the pending values now."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if not self._pending:
+            return
+        values, self._pending = self._pending, {}
+        self.applied += len(values)
+        self._apply(values)
+
+    def as_dict(self) -> dict[str, int]:
+        """Get the counters as a dict."""
+        return {
+            "received": self.received,
+            "merged": self.merged,
+            "dropped": self.dropped,
+            "applied": self.applied,
+            "full": self.full,
+            "pending": len(self._pending),
+        }
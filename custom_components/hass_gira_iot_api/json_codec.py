@@ -0,0 +1,36 @@
+"""JSON codec of the device requests and the callbacks.
+
+orjson is used if it is installed, as it is along with Home Assistant.
+Otherwise the standard library encodes and decodes the documents.
+"""
+
+from collections.abc import Callable
+import json
+from typing import Any
+
+CONTENT_TYPE = "application/json"
+
+
+def stdlib_dumps(obj: Any) -> bytes:
+    """Encode a document with the standard library."""
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode()
+
+
+def stdlib_loads(data: bytes | str) -> Any:
+    """Decode a document with the standard library."""
+    return json.loads(data)
+
+
+dumps: Callable[[Any], bytes]
+loads: Callable[[bytes | str], Any]
+
+try:
+    import orjson
+except ImportError:
+    BACKEND = "json"
+    dumps = stdlib_dumps
+    loads = stdlib_loads
+else:
+    BACKEND = "orjson"
+    dumps = orjson.dumps
+    loads = orjson.loads
@@ -2,9 +2,10 @@
 
 from __future__ import annotations
 
+from collections.abc import Iterable
 import logging
 
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
 from .configentry import MyConfigEntry
@@ -24,17 +25,27 @@ async def async_setup_entry(
 
     coordinator = config_entry.runtime_data.coordinator
     _useless = hass
-    # start with an empty list of entries
-    entries: list[MyLightEntity] = []
-
     giraAPI: GiraDevice = config_entry.runtime_data.gira_api
-    for light in giraAPI.gira_lights.values():
-        mylight: MyLightEntity = MyLightEntity(
-            myGiraDevice=giraAPI, myGiraLight=light, coordinator=coordinator
+
+    @callback
+    def async_add_lights(uids: Iterable[str]) -> None:
+        """Add the entities of the given functions."""
+        # start with an empty list of entries
+        entries: list[MyLightEntity] = []
+        for uid in uids:
+            light = giraAPI.gira_lights.get(uid)
+            if light is None:
+                continue
+            mylight: MyLightEntity = MyLightEntity(
+                myGiraDevice=giraAPI, myGiraLight=light, coordinator=coordinator
+            )
+            config_entry.runtime_data.entities[uid] = mylight
+            entries.append(mylight)
+
+        async_add_entities(
+            entries,
+            update_before_add=True,
         )
-        entries.append(mylight)
 
-    async_add_entities(
-        entries,
-        update_before_add=True,
-    )
+    config_entry.runtime_data.entity_adders["light"] = async_add_lights
+    async_add_lights(giraAPI.gira_lights)
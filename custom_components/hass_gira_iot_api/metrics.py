@@ -0,0 +1,177 @@
+"""Performance metrics of the hot paths of the integration."""
+
+from bisect import bisect_left
+import math
+import time
+from typing import Any
+
+# upper bounds of the latency buckets in seconds
+LATENCY_BUCKETS: tuple[float, ...] = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    math.inf,
+)
+
+
+class Histogram:
+    """Latency histogram with fixed buckets."""
+
+    __slots__ = ("counts", "errors", "samples", "total")
+
+    def __init__(self) -> None:
+        """Init."""
+        self.counts: list[int] = [0] * len(LATENCY_BUCKETS)
+        self.samples: int = 0
+        self.errors: int = 0
+        self.total: float = 0.0
+
+    def observe(self, seconds: float) -> None:
+        """Add a sample."""
+        self.counts[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.samples += 1
+        self.total += seconds
+
+    def quantile(self, q: float) -> float | None:
+        """Get the upper bound of the bucket holding the q-quantile."""
+        if not self.samples:
+            return None
+        rank = q * self.samples
+        seen = 0
+        for bound, count in zip(LATENCY_BUCKETS, self.counts, strict=True):
+            seen += count
+            if seen >= rank:
+                return bound
+        return math.inf
+
+    def as_dict(self) -> dict[str, Any]:
+        """Get the histogram as a dict."""
+        return {
+            "samples": self.samples,
+            "errors": self.errors,
+            "mean": self.total / self.samples if self.samples else None,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+            "buckets": {
+                str(bound): count
+                for bound, count in zip(LATENCY_BUCKETS, self.counts, strict=True)
+                if count
+            },
+        }
+
+
+class RateCounter:
+    """Events per second over a sliding window of one second slots."""
+
+    __slots__ = ("_counts", "_seconds", "_window", "total")
+
+    def __init__(self, window: int = 60) -> None:
+        """Init."""
+        self._window: int = window
+        self._counts: list[int] = [0] * window
+        self._seconds: list[int] = [0] * window
+        self.total: int = 0
+
+    def add(self, count: int = 1) -> None:
+        """Count events."""
+        second = int(time.monotonic())
+        slot = second % self._window
+        if self._seconds[slot] != second:
+            self._seconds[slot] = second
+            self._counts[slot] = 0
+        self._counts[slot] += count
+        self.total += count
+
+    def rate(self) -> float:
+        """Get the events per second within the window."""
+        now = int(time.monotonic())
+        return (
+            sum(
+                count
+                for count, second in zip(self._counts, self._seconds, strict=True)
+                if now - second < self._window
+            )
+            / self._window
+        )
+
+
+class Metrics:
+    """Collection of the latency histograms and event counters.
+
+    When disabled, start() returns 0 and every other call returns right
+    away, so the instrumented code paths cost one attribute lookup.
+    """
+
+    def __init__(self, enabled: bool = False) -> None:
+        """Init."""
+        self.enabled: bool = enabled
+        self.histograms: dict[str, Histogram] = {}
+        self.events: RateCounter = RateCounter()
+
+    def start(self) -> float:
+        """Get the start time of a measurement."""
+        return time.perf_counter() if self.enabled else 0.0
+
+    def observe(self, name: str, start: float) -> None:
+        """Record the time passed since start."""
+        if not start:
+            return
+        self._histogram(name).observe(time.perf_counter() - start)
+
+    def observe_seconds(self, name: str, seconds: float) -> None:
+        """Record a duration measured elsewhere."""
+        if self.enabled:
+            self._histogram(name).observe(seconds)
+
+    def error(self, name: str) -> None:
+        """Count a failed operation."""
+        if self.enabled:
+            self._histogram(name).errors += 1
+
+    def count_events(self, count: int) -> None:
+        """Count received callback events."""
+        if self.enabled:
+            self.events.add(count)
+
+    def _histogram(self, name: str) -> Histogram:
+        """Get or create the histogram of an operation."""
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = Histogram()
+        return histogram
+
+    def total(self, prefix: str, attribute: str = "samples") -> int:
+        """Sum an attribute over the histograms whose name starts with prefix."""
+        return sum(
+            getattr(histogram, attribute)
+            for name, histogram in self.histograms.items()
+            if name.startswith(prefix)
+        )
+
+    def quantile(self, name: str, q: float) -> float | None:
+        """Get a quantile of a histogram."""
+        histogram = self.histograms.get(name)
+        return histogram.quantile(q) if histogram is not None else None
+
+    def as_dict(self) -> dict[str, Any]:
+        """Get all metrics as a dict."""
+        return {
+            "enabled": self.enabled,
+            "events_total": self.events.total,
+            "events_per_second": self.events.rate(),
+            "histograms": {
+                name: histogram.as_dict()
+                for name, histogram in sorted(self.histograms.items())
+            },
+        }
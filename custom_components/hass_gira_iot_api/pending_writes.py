@@ -0,0 +1,137 @@
+"""Optimistic datapoint writes awaiting the confirmation of the device."""
+
+import asyncio
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from typing import Any
+
+from .const import CONST
+from .metrics import Metrics
+from .value_store import Value, ValueStore, decode_value
+
+
+@dataclass(slots=True)
+class PendingWrite:
+    """A written value, the value it replaced and when it was written."""
+
+    value: Value
+    previous: Value
+    start: float
+    handle: asyncio.TimerHandle
+
+
+class PendingWrites:
+    """Written values shown before the device confirms them.
+
+    A write is stored right away, so its entity shows the new state. A
+    callback event reporting the written value, fractional numbers within
+    `tolerance`, confirms the write and its round-trip time is recorded as
+    `write_confirm`. Events with other values are held back. Without a
+    confirmation within `timeout`, or if sending fails, the last value the
+    device reported is restored.
+    """
+
+    def __init__(
+        self,
+        store: ValueStore,
+        notify: Callable[[Iterable[str]], None],
+        metrics: Metrics,
+        timeout: float = CONST.WRITE_CONFIRM_TIMEOUT,
+        tolerance: float = CONST.WRITE_CONFIRM_TOLERANCE,
+    ) -> None:
+        """Init."""
+        self._store = store
+        self._notify = notify
+        self._metrics = metrics
+        self._timeout: float = timeout
+        self._tolerance: float = tolerance
+        self._pending: dict[str, PendingWrite] = {}
+        self.confirmed: int = 0
+        self.rolled_back: int = 0
+
+    def __len__(self) -> int:
+        """Get the number of unconfirmed writes."""
+        return len(self._pending)
+
+    def track(self, uid: str, value: Any) -> None:
+        """Store a written value until the device confirms it."""
+        function_uid = self._store.function_of(uid)
+        if function_uid is None:
+            return
+        pending = self._pending.pop(uid, None)
+        if pending is not None:
+            # overlapping writes roll back to the last confirmed value
+            pending.handle.cancel()
+            previous = pending.previous
+        else:
+            previous = self._store.get(uid)
+        self._store.set(uid, value)
+        self._pending[uid] = PendingWrite(
+            value=decode_value(value),
+            previous=previous,
+            start=self._metrics.start(),
+            handle=asyncio.get_running_loop().call_later(
+                self._timeout, self.rollback, uid
+            ),
+        )
+        self._notify((function_uid,))
+
+    def _matches(self, written: Value, reported: Value) -> bool:
+        """Check if a reported value is the written one.
+
+        Integers must match exactly, as switches only know 0 and 1. Percent
+        values converted from HA are floats and may come back rounded.
+        """
+        if (
+            isinstance(written, int | float)
+            and isinstance(reported, int | float)
+            and (isinstance(written, float) or isinstance(reported, float))
+        ):
+            return abs(written - reported) <= self._tolerance
+        return written == reported
+
+    def confirm(self, uid: str, raw: Any) -> bool:
+        """Confirm a write with a value the device reported.
+
+        Returns whether the value is to be stored, which is not the case
+        while it differs from an unconfirmed write.
+        """
+        pending = self._pending.get(uid)
+        if pending is None:
+            return True
+        reported = decode_value(raw)
+        if not self._matches(pending.value, reported):
+            # an earlier or clamped value, restored if the write times out
+            pending.previous = reported
+            return False
+        del self._pending[uid]
+        pending.handle.cancel()
+        self.confirmed += 1
+        self._metrics.observe("write_confirm", pending.start)
+        return True
+
+    def rollback(self, uid: str) -> None:
+        """Restore the value a write replaced."""
+        pending = self._pending.pop(uid, None)
+        if pending is None:
+            return
+        pending.handle.cancel()
+        self.rolled_back += 1
+        self._metrics.error("write_confirm")
+        function_uid = self._store.set(uid, pending.previous)
+        if function_uid is not None:
+            self._notify((function_uid,))
+
+    def cancel(self) -> None:
+        """Stop tracking all writes, keeping their values."""
+        for pending in self._pending.values():
+            pending.handle.cancel()
+        self._pending.clear()
+
+    def as_dict(self) -> dict[str, int]:
+        """Get the counters as a dict."""
+        return {
+            "pending": len(self._pending),
+            "confirmed": self.confirmed,
+            "rolled_back": self.rolled_back,
+        }
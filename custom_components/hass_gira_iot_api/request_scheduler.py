@@ -0,0 +1,89 @@
+"""Priority scheduling of the requests to a device."""
+
+import asyncio
+from collections.abc import AsyncIterator
+import contextlib
+from enum import IntEnum
+import heapq
+import itertools
+
+from .const import CONST
+
+
+class Priority(IntEnum):
+    """Priority classes of the requests, lower values go first."""
+
+    INTERACTIVE = 0  # commands of a user
+    REFRESH = 1  # targeted refreshes and set-up
+    BACKGROUND = 2  # bulk synchronisation
+
+
+class RequestScheduler:
+    """Limit the requests in flight and start waiting ones by priority.
+
+    At most `limit` requests run at once, the last `reserved` slots are kept
+    for interactive requests, so a user command never waits for more than
+    the running requests. Within a priority class requests start in order.
+    """
+
+    def __init__(
+        self,
+        limit: int = CONST.REQUEST_CONCURRENCY,
+        reserved: int = CONST.REQUEST_RESERVED,
+    ) -> None:
+        """Init."""
+        self._limit: int = limit
+        self._reserved: int = reserved
+        self._active: int = 0
+        self._waiters: list[tuple[int, int, asyncio.Future[None]]] = []
+        self._order = itertools.count()
+
+    @contextlib.asynccontextmanager
+    async def slot(self, priority: Priority) -> AsyncIterator[None]:
+        """Wait for a free slot and hold it while the request runs."""
+        await self._acquire(priority)
+        try:
+            yield
+        finally:
+            self._release()
+
+    def _can_start(self, priority: int) -> bool:
+        """Check if a request of the given priority may start now."""
+        if priority == Priority.INTERACTIVE:
+            return self._active < self._limit
+        return self._active < self._limit - self._reserved
+
+    async def _acquire(self, priority: Priority) -> None:
+        """Take a slot, waiting behind requests of the same or higher priority."""
+        if self._can_start(priority) and not (
+            self._waiters and self._waiters[0][0] <= priority
+        ):
+            self._active += 1
+            return
+        future: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._order), future))
+        try:
+            await future
+        except asyncio.CancelledError:
+            # the slot was handed over right before the cancellation
+            if future.done() and not future.cancelled():
+                self._release()
+            raise
+
+    def _release(self) -> None:
+        """Free a slot and start the waiting requests that fit."""
+        self._active -= 1
+        waiters = self._waiters
+        while waiters and self._can_start(waiters[0][0]):
+            _priority, _order, future = heapq.heappop(waiters)
+            if future.done():
+                continue
+            self._active += 1
+            future.set_result(None)
+
+    def as_dict(self) -> dict[str, int]:
+        """Get the current load as a dict."""
+        return {
+            "active": self._active,
+            "waiting": sum(not future.done() for *_, future in self._waiters),
+        }
@@ -0,0 +1,69 @@
+"""Retry backoff and circuit breaker of the requests to a device."""
+
+import random
+import time
+
+from .const import CONST
+
+
+def backoff_delay(
+    attempt: int,
+    base: float = CONST.RETRY_BACKOFF,
+    cap: float = CONST.RETRY_MAX_BACKOFF,
+) -> float:
+    """Get the jittered delay before a retry, attempt counting from 0.
+
+    Full jitter spreads the retries of many concurrent requests, so they do
+    not hit a recovering device at the same time.
+    """
+    return random.uniform(0, min(cap, base * 2**attempt))
+
+
+class CircuitBreaker:
+    """Stop sending requests to a device that keeps failing.
+
+    After `threshold` consecutive failures the breaker opens and requests
+    fail fast. Once `reset_timeout` passed, one request is let through per
+    timeout: its success closes the breaker, its failure keeps it open.
+    """
+
+    def __init__(
+        self,
+        threshold: int = CONST.BREAKER_THRESHOLD,
+        reset_timeout: float = CONST.BREAKER_RESET_TIMEOUT,
+    ) -> None:
+        """Init."""
+        self._threshold: int = threshold
+        self._reset_timeout: float = reset_timeout
+        self._failures: int = 0
+        self._opened_at: float | None = None
+        self.opened: int = 0
+
+    @property
+    def is_open(self) -> bool:
+        """Check if requests are currently rejected."""
+        return self._opened_at is not None
+
+    def allow(self) -> bool:
+        """Check if a request may be sent."""
+        if self._opened_at is None:
+            return True
+        now = time.monotonic()
+        if now - self._opened_at < self._reset_timeout:
+            return False
+        # probe the device, the next probe waits for another timeout
+        self._opened_at = now
+        return True
+
+    def success(self) -> None:
+        """Record a request the device answered."""
+        self._failures = 0
+        self._opened_at = None
+
+    def failure(self) -> None:
+        """Record a request the device did not answer."""
+        self._failures += 1
+        if self._failures >= self._threshold:
+            if self._opened_at is None:
+                self.opened += 1
+            self._opened_at = time.monotonic()
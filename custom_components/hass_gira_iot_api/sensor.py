@@ -0,0 +1,99 @@
+"""Setting up the diagnostic metrics sensors."""
+
+from __future__ import annotations
+
+import logging
+import math
+
+from homeassistant.components.sensor import SensorStateClass
+from homeassistant.const import UnitOfTime
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+
+from .configentry import MyConfigEntry
+from .entities import MyMetricsSensor, MyMetricsSensorEntityDescription
+from .gira_device import GiraDevice
+from .metrics import Metrics
+
+logging.basicConfig()
+log: logging.Logger = logging.getLogger(name=__name__)
+
+
+def _p95_ms(metrics: Metrics, name: str) -> float | None:
+    """Get the 95th percentile of a histogram in milliseconds."""
+    seconds = metrics.quantile(name, 0.95)
+    if seconds is None or math.isinf(seconds):
+        return None
+    return seconds * 1000
+
+
+METRICS_SENSORS: tuple[MyMetricsSensorEntityDescription, ...] = (
+    MyMetricsSensorEntityDescription(
+        key="requests",
+        name="Requests",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda metrics: metrics.total("http:"),
+    ),
+    MyMetricsSensorEntityDescription(
+        key="request_errors",
+        name="Request errors",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda metrics: metrics.total("http:", "errors"),
+    ),
+    MyMetricsSensorEntityDescription(
+        key="read_latency_p95",
+        name="Read latency p95",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda metrics: _p95_ms(metrics, "http:values_get"),
+    ),
+    MyMetricsSensorEntityDescription(
+        key="write_latency_p95",
+        name="Write latency p95",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda metrics: _p95_ms(metrics, "http:values_put"),
+    ),
+    MyMetricsSensorEntityDescription(
+        key="write_confirm_p95",
+        name="Write confirmation time p95",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda metrics: _p95_ms(metrics, "write_confirm"),
+    ),
+    MyMetricsSensorEntityDescription(
+        key="callback_events_per_second",
+        name="Callback events per second",
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda metrics: metrics.events.rate(),
+    ),
+    MyMetricsSensorEntityDescription(
+        key="entity_update_p95",
+        name="Entity update time p95",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda metrics: _p95_ms(metrics, "entity_update"),
+    ),
+)
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    config_entry: MyConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up the sensor platform."""
+
+    _useless = hass
+    giraAPI: GiraDevice = config_entry.runtime_data.gira_api
+    if not giraAPI.metrics.enabled:
+        return
+
+    async_add_entities(
+        MyMetricsSensor(
+            myGiraDevice=giraAPI,
+            entry_id=config_entry.entry_id,
+            description=description,
+        )
+        for description in METRICS_SENSORS
+    )
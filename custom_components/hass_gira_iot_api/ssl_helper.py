@@ -41,23 +41,29 @@ Notes:
 # Caveat emptor
 #
 
+import asyncio
 from datetime import UTC, datetime, timedelta
+import functools
 import ipaddress
+from pathlib import Path
 
-from aiofiles import open as aiofiles_open
 from cryptography import x509
 from cryptography.hazmat.backends import default_backend
 from cryptography.hazmat.primitives import hashes, serialization
-from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.hazmat.primitives.asymmetric import ec, rsa
 from cryptography.x509.oid import NameOID
 
+KEY_TYPE_RSA = "rsa"
+KEY_TYPE_EC = "ec"
 
-async def generate_selfsigned_cert(hostname, ip_addresses=None, key=None):
-    """Generate a self-signed certificate and private key files.
 
-    The function creates a self-signed X.509 certificate and a matching
-    private key, writes them to `domain_srv.crt` and `domain_srv.key` in the
-    current working directory, and returns nothing.
+def create_selfsigned_cert(
+    hostname, ip_addresses=None, key=None, key_type=KEY_TYPE_RSA
+) -> tuple[bytes, bytes]:
+    """Create a self-signed certificate and its private key.
+
+    This is CPU bound, especially the RSA key generation, so it should run
+    in an executor. Returns the PEM encoded certificate and key.
 
     Parameters
     ----------
@@ -68,23 +74,22 @@ async def generate_selfsigned_cert(hostname, ip_addresses=None, key=None):
         Optional list of IP address strings to include in the SAN. Each entry
         will be added both as a DNSName (for OpenSSL compatibility) and as an
         IPAddress (for stricter TLS implementations) where appropriate.
-    key : rsa.RSAPrivateKey | None, optional
-        Optional existing RSA private key to use. If not provided, a new 2048
-        bit RSA key will be generated.
-
-    Returns:
-    -------
-    None
+    key : rsa.RSAPrivateKey | ec.EllipticCurvePrivateKey | None, optional
+        Optional existing private key to use. If not provided, a new key of
+        `key_type` will be generated.
+    key_type : str, optional
+        KEY_TYPE_RSA for a 2048 bit RSA key or KEY_TYPE_EC for an ECDSA
+        P-256 key, which makes the TLS handshakes considerably cheaper.
 
     Warnings:
     --------
     - The generated certificate is long-lived (10 years by default) and is
       suitable only for testing. Do not use it in production.
-    - The function writes files to the current working directory without
-      additional safeguards.
     """
     # Generate our key
-    if key is None:
+    if key is None and key_type == KEY_TYPE_EC:
+        key = ec.generate_private_key(ec.SECP256R1())
+    elif key is None:
         key = rsa.generate_private_key(
             public_exponent=65537,
             key_size=2048,
@@ -129,8 +134,37 @@ async def generate_selfsigned_cert(hostname, ip_addresses=None, key=None):
         encryption_algorithm=serialization.NoEncryption(),
     )
 
-    # works, besides bytes instead of string warnings
-    async with aiofiles_open("domain_srv.crt", "wb") as f:
-        await f.write(cert_pem)
-    async with aiofiles_open("domain_srv.key", "wb") as f:
-        await f.write(key_pem)
+    return cert_pem, key_pem
+
+
+def _write_cert(cert_path: Path, key_path: Path, cert_pem: bytes, key_pem: bytes):
+    """Write a certificate and its private key, readable by the owner only."""
+    cert_path.parent.mkdir(parents=True, exist_ok=True)
+    cert_path.write_bytes(cert_pem)
+    key_path.touch(mode=0o600)
+    key_path.write_bytes(key_pem)
+
+
+async def generate_selfsigned_cert(
+    hostname,
+    ip_addresses=None,
+    key=None,
+    key_type=KEY_TYPE_RSA,
+    cert_path="domain_srv.crt",
+    key_path="domain_srv.key",
+):
+    """Generate a self-signed certificate and private key files.
+
+    The certificate is created by create_selfsigned_cert and both files are
+    written in an executor, so the event loop is not blocked.
+    """
+    loop = asyncio.get_running_loop()
+    cert_pem, key_pem = await loop.run_in_executor(
+        None,
+        functools.partial(
+            create_selfsigned_cert, hostname, ip_addresses, key, key_type
+        ),
+    )
+    await loop.run_in_executor(
+        None, _write_cert, Path(cert_path), Path(key_path), cert_pem, key_pem
+    )
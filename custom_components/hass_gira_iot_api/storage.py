@@ -0,0 +1,57 @@
+"""Persistent storage of a Gira IOT device."""
+
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from .const import CONST
+
+STORAGE_VERSION = 1
+# changed whenever the stored uiconfig keeps other fields
+UI_FORMAT = 2
+
+
+class GiraStorage:
+    """Per config entry storage of the uiconfig and the client token."""
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Init."""
+        self._store: Store[dict[str, Any]] = Store(
+            hass=hass, version=STORAGE_VERSION, key=f"{CONST.DOMAIN}.{entry_id}"
+        )
+        self._data: dict[str, Any] = {}
+
+    async def async_load(self) -> None:
+        """Load the stored data."""
+        self._data = await self._store.async_load() or {}
+
+    def get_ui(self, ui_uid: str) -> dict[str, Any] | None:
+        """Get the stored uiconfig if it matches the given identifier."""
+        if self._data.get("ui_uid") != ui_uid:
+            return None
+        if self._data.get("ui_format") != UI_FORMAT:
+            return None
+        return self._data.get("ui")
+
+    async def async_save_ui(self, ui_uid: str, ui: dict[str, Any]) -> None:
+        """Store the uiconfig together with its identifier."""
+        self._data["ui_uid"] = ui_uid
+        self._data["ui_format"] = UI_FORMAT
+        self._data["ui"] = ui
+        await self._store.async_save(self._data)
+
+    @property
+    def token(self) -> str | None:
+        """Get the stored client token."""
+        return self._data.get("token")
+
+    async def async_save_token(self, token: str | None) -> None:
+        """Store the client token."""
+        self._data["token"] = token
+        await self._store.async_save(self._data)
+
+    async def async_remove(self) -> None:
+        """Remove the stored data."""
+        self._data = {}
+        await self._store.async_remove()
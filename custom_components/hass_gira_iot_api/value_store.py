@@ -0,0 +1,135 @@
+"""Typed store of the datapoint values of a Gira IOT device."""
+
+from collections.abc import Iterable, Iterator, Mapping
+import sys
+from typing import Any
+
+Value = int | float | str | None
+
+
+def decode_value(raw: Any) -> Value:
+    """Decode a datapoint value as sent by the device.
+
+    The device sends every value as a string. Empty strings become None,
+    numbers become int or float and anything else stays a string.
+    """
+    if not isinstance(raw, str):
+        return raw
+    if raw == "":
+        return None
+    try:
+        return int(raw)
+    except ValueError:
+        pass
+    try:
+        return float(raw)
+    except ValueError:
+        return raw
+
+
+class ValueStore:
+    """Decoded values of all datapoints, indexed by datapoint and function.
+
+    Values are decoded once when they are received. The uid strings are
+    shared between the indexes, and the decoded 0/1 switch values are the
+    interpreter's cached small ints, so most datapoints cost a dict slot only.
+    """
+
+    __slots__ = ("_functions", "_owner", "_values")
+
+    def __init__(self) -> None:
+        """Init."""
+        self._values: dict[str, Value] = {}
+        self._owner: dict[str, str] = {}
+        self._functions: dict[str, list[str]] = {}
+
+    def __len__(self) -> int:
+        """Get the number of stored values."""
+        return len(self._values)
+
+    def __contains__(self, function_uid: object) -> bool:
+        """Check if a function is known."""
+        return function_uid in self._functions
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterate over the function uids."""
+        return iter(self._functions)
+
+    def add_function(self, function_uid: str, datapoint_uids: Iterable[str]) -> None:
+        """Register the datapoints owned by a function."""
+        function_uid = sys.intern(function_uid)
+        datapoints = self._functions.setdefault(function_uid, [])
+        for datapoint_uid in datapoint_uids:
+            if self._owner.get(datapoint_uid) == function_uid:
+                continue
+            datapoint_uid = sys.intern(datapoint_uid)
+            self._owner[datapoint_uid] = function_uid
+            datapoints.append(datapoint_uid)
+
+    def remove_function(self, function_uid: str) -> None:
+        """Forget a function and the values of its datapoints."""
+        for datapoint_uid in self._functions.pop(function_uid, ()):
+            if self._owner.get(datapoint_uid) == function_uid:
+                del self._owner[datapoint_uid]
+                self._values.pop(datapoint_uid, None)
+
+    def function_of(self, datapoint_uid: str) -> str | None:
+        """Get the uid of the function owning a datapoint."""
+        return self._owner.get(datapoint_uid)
+
+    def get(self, datapoint_uid: str) -> Value:
+        """Get the value of a datapoint."""
+        return self._values.get(datapoint_uid)
+
+    def set(self, datapoint_uid: str, raw: Any) -> str | None:
+        """Decode and store the value of a known datapoint.
+
+        Returns the uid of the owning function, or None if the datapoint is
+        unknown and the value was dropped.
+        """
+        function_uid = self._owner.get(datapoint_uid)
+        if function_uid is not None:
+            self._values[datapoint_uid] = decode_value(raw)
+        return function_uid
+
+    def update_function(self, function_uid: str, raw_values: Mapping[str, Any]) -> bool:
+        """Decode and store the values of a function.
+
+        Returns whether any value changed.
+        """
+        self.add_function(function_uid, raw_values)
+        values = self._values
+        changed = False
+        for datapoint_uid, raw in raw_values.items():
+            value = decode_value(raw)
+            if datapoint_uid not in values or values[datapoint_uid] != value:
+                values[datapoint_uid] = value
+                changed = True
+        return changed
+
+    def function_values(self, function_uid: str) -> dict[str, Value]:
+        """Get the known values of a function."""
+        values = self._values
+        return {
+            datapoint_uid: values[datapoint_uid]
+            for datapoint_uid in self._functions.get(function_uid, ())
+            if datapoint_uid in values
+        }
+
+    def memory_footprint(self) -> int:
+        """Get the approximate memory used by the store in bytes."""
+        seen: set[int] = set()
+        size = 0
+        for obj in (
+            self._values,
+            self._owner,
+            self._functions,
+            *self._functions.values(),
+            *self._owner,
+            *self._functions,
+            *self._values.values(),
+        ):
+            if id(obj) not in seen:
+                seen.add(id(obj))
+                size += sys.getsizeof(obj)
+        return size
@@ -0,0 +1,87 @@
+"""Coalescing writer for datapoint values."""
+
+import asyncio
+from collections.abc import Awaitable, Callable
+import logging
+from typing import Any
+
+from .const import CONST
+
+logging.basicConfig()
+log: logging.Logger = logging.getLogger(name=__name__)
+
+
+class WriteBatcher:
+    """Merge datapoint writes issued within a short window into one request.
+
+    Every write gets its own future that completes once the request carrying
+    it has been sent. A datapoint written twice within the window is sent
+    once with the last value. Batches are sent one after another, so a later
+    write never overtakes an earlier one.
+    """
+
+    def __init__(
+        self,
+        send: Callable[[dict[str, Any]], Awaitable[None]],
+        window: float = CONST.WRITE_WINDOW,
+        max_batch: int = CONST.WRITE_MAX_BATCH,
+    ) -> None:
+        """Init."""
+        self._send = send
+        self._window: float = window
+        self._max_batch: int = max_batch
+        self._pending: dict[str, Any] = {}
+        self._waiters: list[asyncio.Future[None]] = []
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._send_lock: asyncio.Lock = asyncio.Lock()
+        self._tasks: set[asyncio.Task[None]] = set()
+
+    async def write(self, uid: str, value: Any) -> None:
+        """Queue a write and wait until it has been sent."""
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[None] = loop.create_future()
+
+        # last write wins and moves to the end of the batch
+        self._pending.pop(uid, None)
+        self._pending[uid] = value
+        self._waiters.append(future)
+
+        if len(self._pending) >= self._max_batch:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self._window, self._flush)
+        await future
+
+    def _flush(self) -> None:
+        """Hand the pending writes over to a send task."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if not self._pending:
+            return
+        values, self._pending = self._pending, {}
+        waiters, self._waiters = self._waiters, []
+        task = asyncio.get_running_loop().create_task(self._send_batch(values, waiters))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _send_batch(
+        self, values: dict[str, Any], waiters: list[asyncio.Future[None]]
+    ) -> None:
+        """Send one batch and complete the futures of its writers."""
+        try:
+            async with self._send_lock:
+                await self._send(values)
+        except Exception as err:  # noqa: BLE001
+            log.warning("Failed to write %d values: %s", len(values), err)
+            for waiter in waiters:
+                if not waiter.done():
+                    waiter.set_exception(err)
+        else:
+            for waiter in waiters:
+                if not waiter.done():
+                    waiter.set_result(None)
+        finally:
+            for waiter in waiters:
+                if not waiter.done():
+                    waiter.cancel()